@@ -1,11 +1,31 @@
-from fastapi import APIRouter, Depends, Response
-from .schema import AuthCreate, AuthLogin, AuthResponse
+from typing import Optional
+from fastapi import APIRouter, Depends, Request, Response
+from .schema import AuthCreate, AuthLogin, AuthResponse, RefreshRequest
 from .service import AuthService
-from app.helpers.auth import check_for_auth
+from app.helpers.auth import check_for_auth, ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_DAYS
 from app.helpers.dependencies import get_auth_service
+from app.middleware.auth import get_token
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+def set_auth_cookies(response: Response, tokens: dict):
+    response.set_cookie(
+        key="access_token",
+        value=tokens["access_token"],
+        httponly=True,
+        max_age=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        samesite="lax"
+    )
+    # Only sent to /auth/refresh and /auth/logout
+    response.set_cookie(
+        key="refresh_token",
+        value=tokens["refresh_token"],
+        httponly=True,
+        max_age=REFRESH_TOKEN_EXPIRE_DAYS * 86400,
+        samesite="lax",
+        path="/auth"
+    )
+
 @router.post("/login")
 async def login(
     user_data: AuthLogin,
@@ -13,14 +33,7 @@ async def login(
     service: AuthService = Depends(get_auth_service)
 ):
     result = await service.login(user_data)
-
-    response.set_cookie(
-        key="access_token",
-        value=result["access_token"],
-        httponly=True,
-        max_age=86400,
-        samesite="lax"
-    )
+    set_auth_cookies(response, result)
 
     return result
 
@@ -31,14 +44,35 @@ async def register(
     service: AuthService = Depends(get_auth_service)
 ):
     result = await service.register(user_data)
+    set_auth_cookies(response, result)
 
-    response.set_cookie(
-        key="access_token",
-        value=result["access_token"],
-        httponly=True,
-        max_age=86400,
-        samesite="lax"
-    )
+    return result
+
+@router.post("/refresh")
+async def refresh(
+    request: Request,
+    response: Response,
+    body: Optional[RefreshRequest] = None,
+    service: AuthService = Depends(get_auth_service)
+):
+    refresh_token = (body.refresh_token if body else None) or request.cookies.get("refresh_token")
+    result = await service.refresh(refresh_token)
+    set_auth_cookies(response, result)
+
+    return result
+
+@router.post("/logout")
+async def logout(
+    request: Request,
+    response: Response,
+    body: Optional[RefreshRequest] = None,
+    service: AuthService = Depends(get_auth_service)
+):
+    refresh_token = (body.refresh_token if body else None) or request.cookies.get("refresh_token")
+    result = await service.logout(get_token(request), refresh_token)
+
+    response.delete_cookie(key="access_token")
+    response.delete_cookie(key="refresh_token", path="/auth")
 
     return result
 
@@ -48,4 +82,4 @@ async def fetch_user(
     service: AuthService = Depends(get_auth_service)
 ):
     result = await service.fetch_auth(user_id)
-    return result
\ No newline at end of file
+    return result
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic import BaseModel, EmailStr, Field, field_validator
 import re
 
@@ -14,6 +15,9 @@ class AuthCreate(BaseModel):
     email: EmailStr = Field(..., description="Valid email address")
     password: str = Field(..., min_length=4, max_length=100, description="Password must be at least 4 characters")
 
+class RefreshRequest(BaseModel):
+    refresh_token: Optional[str] = Field(None, description="Falls back to the refresh_token cookie")
+
 class AuthResponse(BaseModel):
     id: str
     user_name: str
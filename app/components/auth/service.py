@@ -2,8 +2,8 @@ from .schema import AuthCreate, AuthLogin
 from fastapi import HTTPException
 from bson import ObjectId
 from app.helpers.serializer import serialize_doc
-from app.helpers.auth import create_token_response
-from app.helpers.validation import hash_password, verify_password
+from app.helpers.auth import create_session_tokens, rotate_refresh_token, revoke_session, get_session_id
+from app.helpers.password import hash_password_async, verify_password_async
 import logging
 
 logger = logging.getLogger(__name__)
@@ -50,19 +50,27 @@ class AuthService:
             if not existing_user:
                 raise HTTPException(status_code=401, detail="Invalid email or password.")
 
-            if not verify_password(password, existing_user["password"]):
+            is_valid, new_hash = await verify_password_async(password, existing_user["password"])
+            if not is_valid:
                 raise HTTPException(status_code=401, detail="Invalid email or password.")
 
+            if existing_user.get("status", "active") != "active":
+                raise HTTPException(status_code=403, detail="User account is not active.")
+
+            # Upgrade hashes made with an old bcrypt cost
+            if new_hash:
+                await self.db.users.update_one({"_id": existing_user["_id"]}, {"$set": {"password": new_hash}})
+
             del existing_user["password"]
             serialized_user = serialize_doc(existing_user)
 
-            token = create_token_response(serialized_user)
+            tokens = await create_session_tokens(serialized_user)
 
             return {
                 "success": True,
                 "messages": "Login successful",
                 "user": serialized_user,
-                "access_token": token
+                **tokens
             }
 
         except HTTPException:
@@ -81,7 +89,7 @@ class AuthService:
             if existing_user:
                 raise HTTPException(status_code=409, detail="User already exists with this email.")
 
-            user_dict["password"] = hash_password(user_dict["password"])
+            user_dict["password"] = await hash_password_async(user_dict["password"])
             user_dict["provider"] = "groq"
             user_dict["model"] = "llama-3.3-70b-versatile"
             user_dict["image_provider"] = "pollinations"
@@ -92,17 +100,51 @@ class AuthService:
             user = await self.db.users.insert_one(user_dict)
             serialized_user = await self.fetch_auth(str(user.inserted_id))
 
-            token = create_token_response(serialized_user)
+            tokens = await create_session_tokens(serialized_user)
 
             return {
                 "success": True,
                 "messages": "Registration successful",
                 "user": serialized_user,
-                "access_token": token
+                **tokens
             }
 
         except HTTPException:
             raise
         except Exception as e:
             logger.error(f"Error during registration for {email}: {str(e)}", exc_info=True)
-            raise HTTPException(status_code=500, detail=f"Error during registration: {str(e)}")
\ No newline at end of file
+            raise HTTPException(status_code=500, detail=f"Error during registration: {str(e)}")
+
+    async def refresh(self, refresh_token: str):
+        if not refresh_token:
+            raise HTTPException(status_code=401, detail="Refresh token is required.")
+
+        try:
+            tokens = await rotate_refresh_token(refresh_token)
+
+            return {
+                "success": True,
+                "messages": "Token refreshed",
+                **tokens
+            }
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error refreshing token: {str(e)}", exc_info=True)
+            raise HTTPException(status_code=500, detail=f"Error refreshing token: {str(e)}")
+
+    async def logout(self, *tokens: str):
+        try:
+            session_ids = {get_session_id(token) for token in tokens} - {None}
+            for session_id in session_ids:
+                await revoke_session(session_id)
+
+            return {
+                "success": True,
+                "messages": "Logout successful"
+            }
+
+        except Exception as e:
+            logger.error(f"Error during logout: {str(e)}", exc_info=True)
+            raise HTTPException(status_code=500, detail=f"Error during logout: {str(e)}")
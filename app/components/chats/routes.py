@@ -1,14 +1,21 @@
-from fastapi import APIRouter, Depends, Request, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Depends, Request, Query, WebSocket, WebSocketDisconnect, status
 from app.helpers.auth import check_for_auth
 from .schema import CreateChats, UpdateChats, ChatResponse, ConversationResponse
 from app.helpers.dependencies import get_chat_service
 from app.core.socket_manager import manager
-from typing import List
+from typing import List, Optional
+from app.helpers.pagination import Page
+from app.constants.database import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 router = APIRouter(prefix="/chats", tags=["chats"])
 
 @router.websocket("/ws/{user_id}")
-async def websocket_endpoint(websocket: WebSocket, user_id: str):
+async def websocket_endpoint(websocket: WebSocket, user_id: str, _ = Depends(check_for_auth)):
+    # The path id only names the channel; it must be the caller's own
+    if websocket.state.user.get("id") != user_id:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="User Is UnAuthorized.")
+        return
+
     await manager.connect(user_id, websocket)
     try:
         while True:
@@ -37,10 +44,17 @@ async def create_chats(chats: CreateChats, request: Request, service = Depends(g
         
     return result
 
-@router.get("/{receiver_id}", response_model=List[ChatResponse])
-async def get_chats(receiver_id: str, request: Request, service = Depends(get_chat_service), _ = Depends(check_for_auth)):
+@router.get("/{receiver_id}", response_model=Page[ChatResponse])
+async def get_chats(
+    receiver_id: str,
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    service = Depends(get_chat_service),
+    _ = Depends(check_for_auth)
+):
     user = request.state.user
-    result = await service.fetch_chat(receiver_id, user)
+    result = await service.fetch_chat(receiver_id, user, limit, cursor)
     return result
 
 @router.put("/{chat_id}")
@@ -2,6 +2,9 @@ from .schema import CreateChats, UpdateChats
 from bson import ObjectId
 from app.helpers.serializer import serialize_doc, serialize_docs
 from datetime import datetime
+from fastapi import HTTPException
+from app.helpers.pagination import paginate
+from app.constants.database import DEFAULT_PAGE_SIZE
 
 class ChatService:
     def __init__(self, db):
@@ -38,7 +41,7 @@ class ChatService:
             print(f"Error in create_chat: {e}")
             return None, False
 
-    async def fetch_chat(self, receiver_id: str, user):
+    async def fetch_chat(self, receiver_id: str, user, limit: int = DEFAULT_PAGE_SIZE, cursor: str = None):
         try:
             user_id = user.get("id")
             query = {
@@ -47,11 +50,13 @@ class ChatService:
                     {"sender_id": receiver_id, "receiver_id": user_id}
                 ]
             }
-            results = await self.db.chats.find(query).sort("created_at", 1).to_list(length=None)
-            return serialize_docs(results)
+            results, next_cursor = await paginate(self.db.chats, query, [("created_at", 1), ("_id", 1)], limit, cursor)
+            return {"items": serialize_docs(results), "next_cursor": next_cursor}
+        except HTTPException:
+            raise
         except Exception as e:
             print(f"Error in fetch_chat: {e}")
-            return []
+            return {"items": [], "next_cursor": None}
 
     async def update_chat(self, chat_id: str, chats: UpdateChats, user):
         try:
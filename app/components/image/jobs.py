@@ -0,0 +1,349 @@
+import asyncio
+import contextlib
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+from bson import ObjectId
+from fastapi import HTTPException
+from pymongo import ReturnDocument, UpdateOne
+from app.helpers.validation import validate_output_image
+from app.helpers.hedging import hedged
+from app.constants.session import STATUS_PENDING, STATUS_RUNNING, STATUS_SUCCESS, STATUS_ERROR, STATUS_LOADING
+from app.constants.image import (
+    IMAGE_JOB_WORKERS,
+    IMAGE_JOB_POLL_SECONDS,
+    IMAGE_JOB_LEASE_SECONDS,
+    IMAGE_JOB_HEARTBEAT_SECONDS,
+    IMAGE_JOB_MAX_ATTEMPTS,
+    IMAGE_JOB_RETENTION_DAYS,
+    IMAGE_LOADING_BACKOFF_SECONDS,
+    IMAGE_LOADING_MAX_BACKOFF_SECONDS,
+    IMAGE_BATCH_CONCURRENCY,
+    IMAGE_FALLBACK_PROVIDERS,
+    IMAGE_HEDGE_AFTER_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ImageJobQueue:
+    """
+    Image generation jobs stored in `image_jobs` and run by a pool of
+    IMAGE_JOB_WORKERS workers per process. Workers claim jobs with
+    find_one_and_update and renew a lease while they run, so a job left
+    `running` by a crashed worker is picked up again once the lease
+    expires. `attempts` at claim time is the claim token: every write
+    is conditional on it, so a worker that lost its lease can't commit.
+
+    Models that are still loading (HuggingFace cold starts) put the job
+    back with a `not_before` backoff instead of failing it. Outcomes are
+    recorded in `images` and pushed as `image_job` WebSocket events.
+
+    Batch jobs carry `items` ({prompt, seed, status, ...}) instead of a
+    single prompt; one worker runs them with at most IMAGE_BATCH_CONCURRENCY
+    provider calls in flight and records each pass's images in one bulk write.
+    """
+
+    def __init__(self, db, llm_service, moderation_service, connection_manager):
+        self.db = db
+        self.llm = llm_service
+        self.moderation = moderation_service
+        self.manager = connection_manager
+        self._wakeup = asyncio.Event()
+
+    def new_job(self, user_id: str, session_id: str, prompt: str, provider: str) -> Dict:
+        now = datetime.utcnow()
+        return {
+            "_id": ObjectId(),
+            "user_id": user_id,
+            "session_id": session_id,
+            "prompt": prompt,
+            "provider": provider,
+            "status": STATUS_PENDING,
+            "attempts": 0,
+            "not_before": now,
+            "created_at": now,
+        }
+
+    def new_batch_job(self, user_id: str, session_id: str, items: List[Dict], provider: str) -> Dict:
+        job = self.new_job(user_id, session_id, None, provider)
+        del job["prompt"]
+        job["items"] = [{**item, "status": STATUS_PENDING} for item in items]
+        return job
+
+    async def enqueue(self, job: Dict):
+        await self.db.image_jobs.insert_one(job)
+        self._wakeup.set()
+
+    async def get_job(self, job_id: str, user_id: str) -> Dict:
+        job = await self.db.image_jobs.find_one({"_id": ObjectId(job_id), "user_id": user_id})
+        if not job:
+            raise HTTPException(status_code=404, detail="Image job not found")
+        return job
+
+    async def run(self):
+        workers = [asyncio.create_task(self._worker()) for _ in range(IMAGE_JOB_WORKERS)]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+
+    async def _worker(self):
+        while True:
+            try:
+                self._wakeup.clear()
+                job = await self._claim()
+                if job is None:
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), IMAGE_JOB_POLL_SECONDS)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                await self._run(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Image job worker error: {str(e)}", exc_info=True)
+                await asyncio.sleep(IMAGE_JOB_POLL_SECONDS)
+
+    async def _claim(self):
+        now = datetime.utcnow()
+        return await self.db.image_jobs.find_one_and_update(
+            {"$or": [
+                {"status": STATUS_PENDING, "not_before": {"$lte": now}},
+                {"status": STATUS_RUNNING, "lease_until": {"$lt": now}},
+            ]},
+            {
+                "$set": {"status": STATUS_RUNNING, "lease_until": now + timedelta(seconds=IMAGE_JOB_LEASE_SECONDS)},
+                "$inc": {"attempts": 1},
+            },
+            sort=[("not_before", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    def _owned(self, job: Dict) -> Dict:
+        """Filter matching `job` only while this worker's claim still holds."""
+        return {"_id": job["_id"], "status": STATUS_RUNNING, "attempts": job["attempts"]}
+
+    async def _renew(self, job: Dict) -> bool:
+        result = await self.db.image_jobs.update_one(
+            self._owned(job),
+            {"$set": {"lease_until": datetime.utcnow() + timedelta(seconds=IMAGE_JOB_LEASE_SECONDS)}}
+        )
+        return result.matched_count == 1
+
+    async def _heartbeat(self, job: Dict):
+        """Renew the lease until cancelled; returns once the lease is lost."""
+        while True:
+            await asyncio.sleep(IMAGE_JOB_HEARTBEAT_SECONDS)
+            try:
+                if not await self._renew(job):
+                    return
+            except Exception as e:
+                # Keep trying; the lease only lapses if Mongo stays away
+                logger.warning(f"Failed to renew lease on image job {job['_id']}: {str(e)}")
+
+    async def _run(self, job: Dict):
+        processing = asyncio.create_task(self._process(job))
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        try:
+            done, _ = await asyncio.wait({processing, heartbeat}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            heartbeat.cancel()
+            if not processing.done():
+                processing.cancel()
+
+        if processing not in done:
+            logger.warning(f"Lost the lease on image job {job['_id']}, abandoning it")
+            return
+        processing.result()
+
+    async def _process(self, job: Dict):
+        # Also bounds jobs whose worker keeps dying mid-generation
+        if job["attempts"] > IMAGE_JOB_MAX_ATTEMPTS:
+            return await self._fail(job, "Image generation failed, please try again.")
+
+        if "items" in job:
+            return await self._process_batch(job)
+
+        prompt = job["prompt"]
+
+        result = await self._generate(job, prompt)
+        if result.get("error"):
+            return await self._fail(job, result["error"])
+
+        if result.get("status") == STATUS_LOADING:
+            return await self._retry_later(job, result)
+
+        image_url = result.get("image_url", "")
+        if not validate_output_image(image_url):
+            return await self._fail(job, "LLM failed to generate a valid image URL. Please try again.")
+
+        if not await self._record_images(job, [(0, self._image_doc(job, prompt, image_url, result["provider"]))]):
+            return
+
+        if await self._finish(job, {"status": STATUS_SUCCESS, "image_url": image_url}):
+            await self._notify(job, STATUS_SUCCESS, "Image generated successfully", image_url=image_url)
+
+    async def _process_batch(self, job: Dict):
+        items = job["items"]
+        pending = [index for index, item in enumerate(items) if item["status"] == STATUS_PENDING]
+
+        # Caps provider calls, hedges included, not items
+        semaphore = asyncio.Semaphore(IMAGE_BATCH_CONCURRENCY)
+        results = await asyncio.gather(*(
+            self._generate(job, items[index]["prompt"], items[index].get("seed"), semaphore)
+            for index in pending
+        ))
+
+        images, loading = [], None
+        for index, result in zip(pending, results):
+            item = items[index]
+            if result.get("status") == STATUS_LOADING:
+                loading = result
+                continue
+
+            image_url = result.get("image_url", "")
+            if result.get("error") or not validate_output_image(image_url):
+                item["status"] = STATUS_ERROR
+                item["error"] = result.get("error") or "LLM failed to generate a valid image URL. Please try again."
+            else:
+                item["status"] = STATUS_SUCCESS
+                item["image_url"] = image_url
+                images.append((index, self._image_doc(job, item["prompt"], image_url, result["provider"])))
+
+        if images and not await self._record_images(job, images):
+            return
+
+        if loading and job["attempts"] < IMAGE_JOB_MAX_ATTEMPTS:
+            return await self._retry_later(job, loading, {"items": items})
+
+        for item in items:
+            if item["status"] == STATUS_PENDING:
+                item["status"] = STATUS_ERROR
+                item["error"] = "Image model is still loading, please try again later."
+
+        succeeded = any(item["status"] == STATUS_SUCCESS for item in items)
+        status = STATUS_SUCCESS if succeeded else STATUS_ERROR
+        message = "Images generated successfully" if succeeded else "Image generation failed, please try again."
+
+        if await self._finish(job, {"status": status, "items": items}):
+            await self._notify(job, status, message, items=items)
+
+    async def _generate(self, job: Dict, prompt: str, seed: int = None, limit: asyncio.Semaphore = None) -> Dict:
+        """
+        Provider result plus the provider that produced it, or
+        {"error": detail} when generation fails. The job's provider is
+        tried first, the other IMAGE_FALLBACK_PROVIDERS hedge it; `limit`
+        bounds each provider call.
+        """
+        providers = [job["provider"]] + [p for p in IMAGE_FALLBACK_PROVIDERS if p != job["provider"]]
+
+        def attempt(provider: str):
+            async def call():
+                async with limit or contextlib.nullcontext():
+                    return await self.llm.generate_llm_image(prompt, provider, seed)
+            return call
+
+        try:
+            index, result = await self.moderation.guard(
+                prompt,
+                hedged(
+                    [attempt(provider) for provider in providers],
+                    lambda result: validate_output_image(result.get("image_url", "")),
+                    IMAGE_HEDGE_AFTER_SECONDS
+                )
+            )
+            return {**result, "provider": providers[index]}
+        except HTTPException as e:
+            return {"error": e.detail}
+        except Exception as e:
+            logger.error(f"Error generating image for job {job['_id']}: {str(e)}", exc_info=True)
+            return {"error": "Error generating image, please try again."}
+
+    def _image_doc(self, job: Dict, prompt: str, image_url: str, provider: str) -> Dict:
+        return {
+            "prompt": prompt,
+            "image_url": image_url,
+            "session_id": job["session_id"],
+            "user_id": job["user_id"],
+            "provider": provider,
+            "job_id": str(job["_id"]),
+            "is_success": True,
+            "date": datetime.utcnow()
+        }
+
+    async def _record_images(self, job: Dict, images: List[Tuple[int, Dict]]) -> bool:
+        """
+        Insert (item index, image doc) pairs unless the claim is gone.
+        Keyed by (job_id, item), so a worker racing past the check can't
+        add a second row for the same item.
+        """
+        if not await self._renew(job):
+            logger.warning(f"Lost the lease on image job {job['_id']}, dropping its results")
+            return False
+
+        await self.db.images.bulk_write(
+            [
+                UpdateOne({"job_id": doc["job_id"], "item": index}, {"$setOnInsert": {**doc, "item": index}}, upsert=True)
+                for index, doc in images
+            ],
+            ordered=False
+        )
+        return True
+
+    async def _retry_later(self, job: Dict, result: Dict, fields: Dict = None):
+        attempts = job["attempts"]
+        if attempts >= IMAGE_JOB_MAX_ATTEMPTS:
+            return await self._fail(job, "Image model is still loading, please try again later.")
+
+        # Provider's own estimate when it gives one, exponential otherwise
+        delay = min(
+            IMAGE_LOADING_MAX_BACKOFF_SECONDS,
+            max(result.get("retry_after") or 0, IMAGE_LOADING_BACKOFF_SECONDS * 2 ** (attempts - 1))
+        )
+
+        updated = await self.db.image_jobs.update_one(
+            self._owned(job),
+            {
+                "$set": {**(fields or {}), "status": STATUS_PENDING, "not_before": datetime.utcnow() + timedelta(seconds=delay)},
+                "$unset": {"lease_until": ""}
+            }
+        )
+        if updated.matched_count:
+            await self._notify(job, STATUS_PENDING, f"Model is loading, retrying in {round(delay)} seconds", retry_in=round(delay))
+
+    async def _fail(self, job: Dict, detail: str):
+        if await self._finish(job, {"status": STATUS_ERROR, "error": detail}):
+            await self._notify(job, STATUS_ERROR, detail)
+
+    async def _finish(self, job: Dict, fields: Dict) -> bool:
+        """False if another worker has taken the job over."""
+        now = datetime.utcnow()
+        result = await self.db.image_jobs.update_one(
+            self._owned(job),
+            {
+                "$set": {**fields, "finished_at": now, "expires_at": now + timedelta(days=IMAGE_JOB_RETENTION_DAYS)},
+                "$unset": {"lease_until": ""}
+            }
+        )
+        return result.matched_count == 1
+
+    async def _notify(self, job: Dict, status: str, message: str, **extra):
+        try:
+            await self.manager.send_personal_message(
+                {
+                    "type": "image_job",
+                    "job_id": str(job["_id"]),
+                    "session_id": job["session_id"],
+                    "status": status,
+                    "message": message,
+                    **extra
+                },
+                job["user_id"]
+            )
+        except Exception as e:
+            # Offline clients can still read the job via GET /image/jobs/{job_id}
+            logger.warning(f"Failed to push image job {job['_id']}: {str(e)}")
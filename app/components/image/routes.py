@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, Request
+from typing import Optional
+from fastapi import APIRouter, Depends, Request, Query
 from app.helpers.auth import check_for_auth
 from app.helpers.dependencies import get_image_service
-from .schema import CreateImage
+from .schema import CreateImage, CreateImageBatch
+from app.constants.database import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 router = APIRouter(prefix="/image", tags=["image"], dependencies=[Depends(check_for_auth)])
 
@@ -11,8 +13,26 @@ async def create_image(request: Request, prompt: CreateImage, service = Depends(
     result = await service.create_image(user, prompt)
     return result
 
+@router.post("/batch")
+async def create_image_batch(request: Request, batch: CreateImageBatch, service = Depends(get_image_service)):
+    user = request.state.user
+    result = await service.create_image_batch(user, batch)
+    return result
+
+@router.get("/jobs/{job_id}")
+async def get_image_job(job_id: str, request: Request, service = Depends(get_image_service)):
+    user = request.state.user
+    result = await service.get_job(job_id, user.get("id", ""))
+    return result
+
 @router.get("/{session_id}")
-async def get_image(session_id: str, request: Request, service = Depends(get_image_service)):
+async def get_image(
+    session_id: str,
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    service = Depends(get_image_service)
+):
     user = request.state.user
-    result = await service.fetch_images_by_session(session_id, user.get("id", ""))
+    result = await service.fetch_images_by_session(session_id, user.get("id", ""), limit, cursor)
     return result
\ No newline at end of file
@@ -1,6 +1,6 @@
-from pydantic import BaseModel, Field, field_validator
-from typing import Optional
-from app.constants.session import STATUS_SUCCESS
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import List, Optional
+from app.constants.image import IMAGE_BATCH_MAX_PROMPTS, IMAGE_BATCH_MAX_VARIANTS, IMAGE_BATCH_MAX_ITEMS
 
 class Image(BaseModel):
     id: str
@@ -9,11 +9,26 @@ class Image(BaseModel):
     is_success: bool
     prompt: str
 
-class ImageResponse(BaseModel):
-    image_url: str
+class ImageJobResponse(BaseModel):
+    job_id: str
+    session_id: str
+    status: str
+    message: str
+
+class ImageJobItem(BaseModel):
+    prompt: str
+    seed: Optional[int] = None
+    status: str
+    image_url: Optional[str] = None
+    error: Optional[str] = None
+
+class ImageJob(BaseModel):
+    job_id: str
     session_id: str
-    status: str = STATUS_SUCCESS
-    message: str = "Image generated successfully"
+    status: str
+    image_url: Optional[str] = None
+    error: Optional[str] = None
+    items: Optional[List[ImageJobItem]] = None
 
 class CreateImage(BaseModel):
     prompt: str = Field(..., min_length=3, max_length=1000, description="Image generation prompt")
@@ -23,4 +38,26 @@ class CreateImage(BaseModel):
     def validate_prompt(cls, v):
         if not v.strip():
             raise ValueError('Prompt cannot be empty or whitespace only')
-        return ' '.join(v.split())
\ No newline at end of file
+        return ' '.join(v.split())
+
+
+class CreateImageBatch(BaseModel):
+    prompts: List[str] = Field(..., min_length=1, max_length=IMAGE_BATCH_MAX_PROMPTS, description="Image generation prompts")
+    variants: int = Field(1, ge=1, le=IMAGE_BATCH_MAX_VARIANTS, description="Images to generate per prompt, each with its own seed")
+    session_id: Optional[str] = Field(None, description="Session ID (creates new session if not provided)")
+
+    @field_validator('prompts')
+    def validate_prompts(cls, v):
+        prompts = []
+        for prompt in v:
+            prompt = ' '.join(prompt.split())
+            if len(prompt) < 3 or len(prompt) > 1000:
+                raise ValueError('Each prompt must be between 3 and 1000 characters')
+            prompts.append(prompt)
+        return prompts
+
+    @model_validator(mode='after')
+    def validate_size(self):
+        if len(self.prompts) * self.variants > IMAGE_BATCH_MAX_ITEMS:
+            raise ValueError(f'A batch can generate at most {IMAGE_BATCH_MAX_ITEMS} images')
+        return self
@@ -1,22 +1,41 @@
-from .schema import CreateImage, ImageResponse
+from .schema import CreateImage, CreateImageBatch, ImageJobResponse, ImageJob
+from .jobs import ImageJobQueue
 from fastapi import HTTPException
-from datetime import datetime
+from bson.errors import InvalidId
+import random
 import logging
 from app.helpers.serializer import serialize_docs
-from app.constants.session import SESSION_TYPE_IMAGE, STATUS_SUCCESS, STATUS_LOADING
+from app.helpers.pagination import paginate
+from app.constants.database import DEFAULT_PAGE_SIZE
+from app.constants.session import SESSION_TYPE_IMAGE, STATUS_PENDING
 from app.constants.llm import PROVIDER_POLLINATIONS
-from app.constants.image import IMAGE_FALLBACK_PROVIDERS
-from app.constants.validation import MAX_RETRY_ATTEMPTS
-from app.helpers.validation import validate_prompt, validate_output_image
+from app.core.socket_manager import manager
 
 logger = logging.getLogger(__name__)
 
 class ImageService:
 
-    def __init__(self, db, llm_service, session_service):
+    def __init__(self, db, llm_service, session_service, moderation_service):
         self.db = db
         self.llm = llm_service
         self.session = session_service
+        self.moderation = moderation_service
+        self.jobs = ImageJobQueue(db, llm_service, moderation_service, manager)
+
+    async def _resolve_session(self, session_id: str, user_id: str) -> str:
+        if session_id:
+            try:
+                await self.session.check_session(session_id, user_id)
+                return session_id
+            except:
+                pass
+
+        session = await self.session.create_session(
+            user_id,
+            "Image Generation",
+            SESSION_TYPE_IMAGE
+        )
+        return session["id"]
 
     async def create_image(self, user, prompt: CreateImage):
         try:
@@ -25,61 +44,18 @@ class ImageService:
             session_id = prompt.session_id
             user_id = user.get("id")
 
-            validate_prompt(prompt_text, intent="image")
-
-            if session_id:
-                try:
-                    await self.session.check_session(session_id, user_id)
-                except:
-                    session = await self.session.create_session(
-                        user_id,
-                        "Image Generation",
-                        SESSION_TYPE_IMAGE
-                    )
-                    session_id = session["id"]
-            else:
-                session = await self.session.create_session(
-                    user_id,
-                    "Image Generation",
-                    SESSION_TYPE_IMAGE
-                )
-                session_id = session["id"]
-
-            result = await self.llm.generate_llm_image(prompt_text, provider)
-
-            if result.get("status") == STATUS_LOADING:
-                return ImageResponse(
-                    image_url="",
-                    session_id=session_id,
-                    status=STATUS_LOADING,
-                    message=result.get("message", "Model is loading, try again in 20 seconds")
-                )
-
-            image_url = result.get("image_url", "")
-
-            if not validate_output_image(image_url):
-                raise HTTPException(
-                    status_code=500,
-                    detail="LLM failed to generate a valid image URL. Please try again."
-                )
-
-            image_doc = {
-                "prompt": prompt_text,
-                "image_url": image_url,
-                "session_id": session_id,
-                "user_id": user_id,
-                "provider": provider,
-                "is_success": True,
-                "date": datetime.utcnow()
-            }
-
-            await self.db["images"].insert_one(image_doc)
-
-            return ImageResponse(
-                image_url=image_url,
+            self.moderation.check_inline(prompt_text, intent="image")
+
+            session_id = await self._resolve_session(session_id, user_id)
+
+            job = self.jobs.new_job(user_id, session_id, prompt_text, provider)
+            await self.jobs.enqueue(job)
+
+            return ImageJobResponse(
+                job_id=str(job["_id"]),
                 session_id=session_id,
-                status=STATUS_SUCCESS,
-                message="Image generated successfully"
+                status=STATUS_PENDING,
+                message="Image generation started"
             )
 
         except HTTPException:
@@ -87,13 +63,62 @@ class ImageService:
         except Exception as e:
             logger.error(f"Error generating image: {str(e)}", exc_info=True)
             raise HTTPException(status_code=500, detail=f"Error generating image: {str(e)}")
-        
-    async def fetch_images_by_session(self, session_id: str, user_id: str):
+
+    async def create_image_batch(self, user, batch: CreateImageBatch):
+        try:
+            provider = user.get("image_provider", PROVIDER_POLLINATIONS)
+            user_id = user.get("id")
+
+            for prompt_text in dict.fromkeys(batch.prompts):
+                self.moderation.check_inline(prompt_text, intent="image")
+
+            session_id = await self._resolve_session(batch.session_id, user_id)
+
+            # Variants differ by seed; a single image per prompt stays unseeded so it can hit the cache
+            items = [
+                {"prompt": prompt_text, "seed": random.randrange(2 ** 31) if batch.variants > 1 else None}
+                for prompt_text in batch.prompts
+                for _ in range(batch.variants)
+            ]
+
+            job = self.jobs.new_batch_job(user_id, session_id, items, provider)
+            await self.jobs.enqueue(job)
+
+            return ImageJobResponse(
+                job_id=str(job["_id"]),
+                session_id=session_id,
+                status=STATUS_PENDING,
+                message=f"Generating {len(items)} images"
+            )
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error generating image batch: {str(e)}", exc_info=True)
+            raise HTTPException(status_code=500, detail=f"Error generating images: {str(e)}")
+
+    async def get_job(self, job_id: str, user_id: str):
+        try:
+            job = await self.jobs.get_job(job_id, user_id)
+            return ImageJob(
+                job_id=str(job["_id"]),
+                session_id=job["session_id"],
+                status=job["status"],
+                image_url=job.get("image_url"),
+                error=job.get("error"),
+                items=job.get("items")
+            )
+        except InvalidId:
+            raise HTTPException(status_code=404, detail="Image job not found")
+
+    async def fetch_images_by_session(self, session_id: str, user_id: str, limit: int = DEFAULT_PAGE_SIZE, cursor: str = None):
         try:
             await self.session.check_session(session_id, user_id)
 
-            result = await self.db.images.find({"session_id": session_id}).to_list(length=None)
-            return serialize_docs(result)
-        
+            result, next_cursor = await paginate(self.db.images, {"session_id": session_id}, [("_id", 1)], limit, cursor)
+            return {"items": serialize_docs(result), "next_cursor": next_cursor}
+
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=404, detail="error fetching images.")
\ No newline at end of file
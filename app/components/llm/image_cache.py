@@ -0,0 +1,107 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import unicodedata
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Optional
+from app.constants.files import S3_IMAGES_PREFIX
+from app.utils.s3 import object_exists, get_s3_url
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Case, Unicode form and whitespace differences don't make a new image."""
+    return " ".join(unicodedata.normalize("NFKC", prompt).lower().split())
+
+
+def image_cache_key(provider: str, model: str, size: Dict[str, int], prompt: str, seed: Optional[int] = None) -> str:
+    """Stable across processes, unlike hash(); also names the S3 object."""
+    identity = [provider, model, size.get("width"), size.get("height"), normalize_prompt(prompt)]
+    if seed is not None:
+        # Only seeded variants carry it, so unseeded keys stay as they were
+        identity.append(seed)
+    return hashlib.sha256(json.dumps(identity).encode("utf-8")).hexdigest()
+
+
+def image_s3_key(cache_key: str) -> str:
+    return f"{S3_IMAGES_PREFIX}generated_{cache_key}.png"
+
+
+class ImageCache:
+    """
+    Content-addressed cache of generated images. `image_cache` maps a
+    cache key to the S3 URL; the S3 object is named after the same key,
+    so an object uploaded without its record (crash, another worker) is
+    still found. Identical prompts in flight on this worker share one
+    provider call, which is cancelled once every caller waiting on it
+    is (e.g. the losing attempt of a hedged generation).
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+
+    async def lookup(self, cache_key: str) -> Optional[str]:
+        try:
+            entry = await self.db.image_cache.find_one({"_id": cache_key}, {"image_url": 1})
+            if entry:
+                return entry["image_url"]
+
+            s3_key = image_s3_key(cache_key)
+            if await asyncio.to_thread(object_exists, s3_key):
+                image_url = get_s3_url(os.getenv('BUCKET_NAME'), s3_key, os.getenv('S3_REGION', 'ap-south-1'))
+                await self.store(cache_key, image_url, {})
+                return image_url
+        except Exception as e:
+            # A cache outage only costs a fresh generation
+            logger.warning(f"Image cache lookup failed for {cache_key}: {str(e)}")
+
+        return None
+
+    async def store(self, cache_key: str, image_url: str, details: Dict):
+        try:
+            await self.db.image_cache.update_one(
+                {"_id": cache_key},
+                {"$setOnInsert": {**details, "image_url": image_url, "created_at": datetime.utcnow()}},
+                upsert=True
+            )
+        except Exception as e:
+            logger.warning(f"Failed to record image cache entry {cache_key}: {str(e)}")
+
+    async def get_or_generate(self, cache_key: str, generate: Callable[[], Awaitable[Dict]], details: Dict) -> Dict:
+        """
+        Return {"image_url", "cached": True} on a hit, otherwise the result
+        of `generate()`, which is cached when it holds an image_url.
+        """
+        image_url = await self.lookup(cache_key)
+        if image_url:
+            return {"image_url": image_url, "cached": True}
+
+        task = self._inflight.get(cache_key)
+        if task is None:
+            task = asyncio.create_task(self._generate(cache_key, generate, details))
+            self._inflight[cache_key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(cache_key, None))
+
+        # One waiter leaving must not cancel the call the others share
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._waiters[task] == 1:
+                task.cancel()
+            raise
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+
+    async def _generate(self, cache_key: str, generate: Callable[[], Awaitable[Dict]], details: Dict) -> Dict:
+        result = await generate()
+        if result.get("image_url"):
+            await self.store(cache_key, result["image_url"], details)
+        return result
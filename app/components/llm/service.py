@@ -1,16 +1,25 @@
 import os
+import json
 import httpx
 import logging
+from typing import AsyncIterator, Optional
 from dotenv import load_dotenv
 from fastapi import HTTPException
 from app.helpers.ai import get_model_and_url
-from app.helpers.validation import validate_output_image
+from app.helpers.validation import detect_image_type
 from app.helpers.retry import async_retry
 from urllib.parse import quote
-from app.constants.image import DEFAULT_IMAGE_SIZE, DEFAULT_POLLINATIONS_MODEL, DEFAULT_HUGGINGFACE_IMAGE_MODEL
-from app.constants.files import S3_IMAGES_PREFIX
+from app.constants.image import (
+    DEFAULT_IMAGE_SIZE,
+    DEFAULT_POLLINATIONS_MODEL,
+    DEFAULT_HUGGINGFACE_IMAGE_MODEL,
+    MAX_GENERATED_IMAGE_BYTES,
+    IMAGE_STREAM_CHUNK_SIZE,
+    IMAGE_SNIFF_BYTES,
+)
 from app.constants.session import STATUS_LOADING
-from app.utils.s3 import upload_bytes_to_s3, get_s3_url
+from app.utils.s3 import stream_to_s3
+from app.components.llm.image_cache import ImageCache, image_cache_key, image_s3_key, normalize_prompt
 
 load_dotenv()
 
@@ -21,88 +30,87 @@ class LlmService:
     def __init__(self, db):
         self.db = db
         self.http_client = httpx.AsyncClient(timeout=60.0)
+        self.image_cache = ImageCache(db)
 
     async def close(self):
         await self.http_client.aclose()
 
-    @async_retry(max_attempts=3)
-    async def generate_llm_text(self, messages: list, provider: str, model: str):
-        try:
-            model_details = get_model_and_url(provider, model)
-
-            if not model_details or not model_details.get("endpoint"):
-                logger.error(f"Invalid model or endpoint not configured for: {model}")
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Invalid model or endpoint not configured for: {model}"
-                )
-
-            endpoint = model_details["endpoint"]
-            if endpoint is None:
-                logger.error(f"Endpoint is None for provider: {provider}, model: {model}")
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Endpoint is None for provider: {provider}, model: {model}"
-                )
-
-            headers = {}
-            payload = {}
+    def _build_text_request(self, messages: list, provider: str, model: str, stream: bool = False):
+        model_details = get_model_and_url(provider, model)
 
-            if provider == "groq":
-                api_key = os.getenv("GROQ_API_KEY")
-                if not api_key:
-                    raise HTTPException(status_code=400, detail="GROQ_API_KEY not configured in environment")
-                headers = {
-                    "Authorization": f"Bearer {api_key}",
-                    "Content-Type": "application/json"
-                }
-                payload = {
-                    "model": model_details["model"],
-                    "messages": messages,
-                    "stream": False
-                }
+        if not model_details or not model_details.get("endpoint"):
+            logger.error(f"Invalid model or endpoint not configured for: {model}")
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid model or endpoint not configured for: {model}"
+            )
 
-            elif provider == "gemini":
-                api_key = os.getenv("GEMINI_API_KEY")
-                if not api_key:
-                    raise HTTPException(status_code=400, detail="GEMINI_API_KEY not configured in environment")
-                endpoint = f"{endpoint}/models/{model_details['model']}:generateContent?key={api_key}"
-                headers = {"Content-Type": "application/json"}
-                contents = []
-                for msg in messages:
-                    role = "user" if msg["role"] == "user" else "model"
-                    contents.append({"role": role, "parts": [{"text": msg["content"]}]})
-                payload = {"contents": contents}
+        endpoint = model_details["endpoint"]
+        if endpoint is None:
+            logger.error(f"Endpoint is None for provider: {provider}, model: {model}")
+            raise HTTPException(
+                status_code=400,
+                detail=f"Endpoint is None for provider: {provider}, model: {model}"
+            )
 
-            elif provider == "huggingface":
-                api_key = os.getenv("HUGGINGFACE_API_KEY")
-                if not api_key:
-                    raise HTTPException(status_code=400, detail="HUGGINGFACE_API_KEY not configured in environment")
-                headers = {
-                    "Authorization": f"Bearer {api_key}",
-                    "Content-Type": "application/json"
-                }
-                payload = {
-                    "model": model_details["model"],
-                    "messages": messages,
-                    "stream": False
-                }
+        headers = {}
+        payload = {}
 
-            response = await self.http_client.post(endpoint, headers=headers, json=payload)
-            response.raise_for_status()
+        if provider == "groq":
+            api_key = os.getenv("GROQ_API_KEY")
+            if not api_key:
+                raise HTTPException(status_code=400, detail="GROQ_API_KEY not configured in environment")
+            headers = {
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json"
+            }
+            payload = {
+                "model": model_details["model"],
+                "messages": messages,
+                "stream": stream
+            }
 
-            result = response.json()
+        elif provider == "gemini":
+            api_key = os.getenv("GEMINI_API_KEY")
+            if not api_key:
+                raise HTTPException(status_code=400, detail="GEMINI_API_KEY not configured in environment")
+            if stream:
+                endpoint = f"{endpoint}/models/{model_details['model']}:streamGenerateContent?alt=sse&key={api_key}"
+            else:
+                endpoint = f"{endpoint}/models/{model_details['model']}:generateContent?key={api_key}"
+            headers = {"Content-Type": "application/json"}
+            contents, system_parts = [], []
+            for msg in messages:
+                if msg["role"] == "system":
+                    system_parts.append({"text": msg["content"]})
+                    continue
+                role = "user" if msg["role"] == "user" else "model"
+                contents.append({"role": role, "parts": [{"text": msg["content"]}]})
+            payload = {"contents": contents}
+            if system_parts:
+                payload["systemInstruction"] = {"parts": system_parts}
+
+        elif provider == "huggingface":
+            api_key = os.getenv("HUGGINGFACE_API_KEY")
+            if not api_key:
+                raise HTTPException(status_code=400, detail="HUGGINGFACE_API_KEY not configured in environment")
+            headers = {
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json"
+            }
+            payload = {
+                "model": model_details["model"],
+                "messages": messages,
+                "stream": stream
+            }
 
-            if provider == "groq":
-                return result.get("choices", [{}])[0].get("message", {}).get("content", "")
-            elif provider == "gemini":
-                return result.get("candidates", [{}])[0].get("content", {}).get("parts", [{}])[0].get("text", "")
-            elif provider == "huggingface":
-                return result.get("choices", [{}])[0].get("message", {}).get("content", "")
+        return endpoint, headers, payload
 
-            return ""
+    def _text_error(self, e: Exception, provider: str, model: str) -> HTTPException:
+        if isinstance(e, HTTPException):
+            return e
 
-        except httpx.HTTPStatusError as e:
+        if isinstance(e, httpx.HTTPStatusError):
             error_detail = str(e)
             if e.response is not None:
                 try:
@@ -117,39 +125,101 @@ class LlmService:
                     error_detail = e.response.text or str(e)
 
             logger.error(f"{provider} API error: {error_detail}")
-            raise HTTPException(
+            return HTTPException(
                 status_code=e.response.status_code if e.response else 500,
                 detail=f"{provider} API error: {error_detail}"
             )
-        except httpx.TimeoutException as e:
+
+        if isinstance(e, httpx.TimeoutException):
             logger.error(f"Timeout error for {provider} after retries: {str(e)}")
-            raise HTTPException(
+            return HTTPException(
                 status_code=504,
                 detail=f"{provider} took too long to respond after multiple attempts. Try a simpler question."
             )
-        except httpx.ConnectError as e:
+
+        if isinstance(e, httpx.ConnectError):
             logger.error(f"Connection error for {provider} after retries: {str(e)}")
-            raise HTTPException(
+            return HTTPException(
                 status_code=503,
                 detail=f"Cannot connect to {provider} after multiple attempts. Make sure {provider} is running and accessible."
             )
-        except HTTPException:
-            raise
+
+        logger.error(f"Unexpected error generating answer with {provider}/{model}: {str(e)}", exc_info=True)
+        return HTTPException(
+            status_code=500,
+            detail=f"Error generating answer: {str(e)}"
+        )
+
+    @async_retry(max_attempts=3)
+    async def generate_llm_text(self, messages: list, provider: str, model: str):
+        try:
+            endpoint, headers, payload = self._build_text_request(messages, provider, model)
+
+            response = await self.http_client.post(endpoint, headers=headers, json=payload)
+            response.raise_for_status()
+
+            result = response.json()
+
+            if provider == "groq":
+                return result.get("choices", [{}])[0].get("message", {}).get("content", "")
+            elif provider == "gemini":
+                return result.get("candidates", [{}])[0].get("content", {}).get("parts", [{}])[0].get("text", "")
+            elif provider == "huggingface":
+                return result.get("choices", [{}])[0].get("message", {}).get("content", "")
+
+            return ""
+
         except Exception as e:
-            logger.error(f"Unexpected error generating answer with {provider}/{model}: {str(e)}", exc_info=True)
-            raise HTTPException(
-                status_code=500,
-                detail=f"Error generating answer: {str(e)}"
-            )
+            raise self._text_error(e, provider, model)
+
+    async def stream_llm_text(self, messages: list, provider: str, model: str) -> AsyncIterator[str]:
+        """Yield answer text fragments as the provider streams them (SSE)."""
+        try:
+            endpoint, headers, payload = self._build_text_request(messages, provider, model, stream=True)
+
+            async with self.http_client.stream("POST", endpoint, headers=headers, json=payload) as response:
+                if response.is_error:
+                    await response.aread()
+                response.raise_for_status()
+
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+
+                    data = line[len("data:"):].strip()
+                    if not data or data == "[DONE]":
+                        continue
+
+                    chunk = json.loads(data)
+                    if provider == "gemini":
+                        text = chunk.get("candidates", [{}])[0].get("content", {}).get("parts", [{}])[0].get("text", "")
+                    else:
+                        text = chunk.get("choices", [{}])[0].get("delta", {}).get("content") or ""
+
+                    if text:
+                        yield text
+
+        except Exception as e:
+            raise self._text_error(e, provider, model)
+
+    async def generate_llm_image(self, prompt: str, provider: str, seed: Optional[int] = None):
+        model = DEFAULT_POLLINATIONS_MODEL if provider == "pollinations" else DEFAULT_HUGGINGFACE_IMAGE_MODEL
+        cache_key = image_cache_key(provider, model, DEFAULT_IMAGE_SIZE, prompt, seed)
+
+        return await self.image_cache.get_or_generate(
+            cache_key,
+            lambda: self._generate_image(prompt, provider, image_s3_key(cache_key), seed),
+            {"provider": provider, "model": model, "size": DEFAULT_IMAGE_SIZE, "prompt": normalize_prompt(prompt), "seed": seed}
+        )
 
     @async_retry(max_attempts=3)
-    async def generate_llm_image(self, prompt: str, provider: str):
+    async def _generate_image(self, prompt: str, provider: str, s3_key: str, seed: Optional[int] = None):
         try:
             image = ""
             if provider == "pollinations":
-                image = await self.pollination(prompt)
+                image = await self.pollination(prompt, s3_key, seed)
             else:
-                image = await self.hugging_face(prompt)
+                image = await self.hugging_face(prompt, s3_key, seed)
             return image
         except httpx.TimeoutException as e:
             logger.error(f"Timeout generating image with {provider} after retries: {str(e)}")
@@ -169,43 +239,58 @@ class LlmService:
             logger.error(f"Error generating image with {provider}: {str(e)}", exc_info=True)
             raise HTTPException(status_code=500, detail=f"Error generating image: {str(e)}")
 
-    async def hugging_face(self, prompt: str):
+    async def _stream_image_to_s3(self, response: httpx.Response, s3_key: str) -> str:
+        """Pipe a provider's image response into S3, checking type and size as it arrives."""
+        failed = HTTPException(status_code=500, detail="Image generation failed, please try again")
+
+        # Validate content type before saving
+        if not response.headers.get("content-type", "").startswith("image/"):
+            raise failed
+
+        if int(response.headers.get("content-length") or 0) > MAX_GENERATED_IMAGE_BYTES:
+            raise HTTPException(status_code=502, detail="Generated image is too large.")
+
+        chunks = response.aiter_bytes(IMAGE_STREAM_CHUNK_SIZE)
+        head = b""
+        async for chunk in chunks:
+            head += chunk
+            if len(head) >= IMAGE_SNIFF_BYTES:
+                break
+
+        # The header alone is not trusted: the bytes must really be an image
+        content_type = detect_image_type(head)
+        if not content_type:
+            raise failed
+
+        async def body():
+            yield head
+            async for chunk in chunks:
+                yield chunk
+
+        try:
+            return await stream_to_s3(body(), s3_key, content_type, MAX_GENERATED_IMAGE_BYTES)
+        except ValueError:
+            raise HTTPException(status_code=502, detail="Generated image is too large.")
+
+    async def hugging_face(self, prompt: str, s3_key: str, seed: Optional[int] = None):
         try:
             url = f"https://api-inference.huggingface.co/models/{DEFAULT_HUGGINGFACE_IMAGE_MODEL}"
 
             headers = {"Authorization": f"Bearer {os.getenv('HUGGINGFACE_API_KEY')}"}
             payload = {"inputs": prompt}
+            if seed is not None:
+                payload["parameters"] = {"seed": seed}
 
-            response = await self.http_client.post(url, headers=headers, json=payload)
-
-            if response.status_code == 503:
-                return {"status": STATUS_LOADING, "message": "Model is loading, try again in 20 seconds"}
-
-            content_type = response.headers.get("content-type", "")
-            if not content_type.startswith("image/"):
-                raise HTTPException(
-                    status_code=500,
-                    detail="Image generation failed, please try again"
-                )
-
-            bucket = os.getenv('BUCKET_NAME')
-            region = os.getenv('S3_REGION', 'ap-south-1')
-            filename = f"generated_{hash(prompt)}.png"
-            s3_key = f"{S3_IMAGES_PREFIX}{filename}"
-            
-            expected_url = get_s3_url(bucket, s3_key, region)
-
-            if not validate_output_image(expected_url):
-                raise HTTPException(
-                    status_code=500,
-                    detail="Image generation failed, please try again"
-                )
-
-            image_url = upload_bytes_to_s3(
-                data=response.content,
-                key=s3_key,
-                content_type='image/png'
-            )
+            async with self.http_client.stream("POST", url, headers=headers, json=payload) as response:
+                if response.status_code == 503:
+                    await response.aread()
+                    try:
+                        retry_after = response.json().get("estimated_time")
+                    except ValueError:
+                        retry_after = None
+                    return {"status": STATUS_LOADING, "message": "Model is loading, try again in 20 seconds", "retry_after": retry_after}
+
+                image_url = await self._stream_image_to_s3(response, s3_key)
 
             return {"image_url": image_url}
         except HTTPException:
@@ -214,7 +299,7 @@ class LlmService:
             logger.error(f"Error generating HuggingFace image: {str(e)}", exc_info=True)
             raise HTTPException(status_code=500, detail=f"Error generating HuggingFace image: {str(e)}")
 
-    async def pollination(self, prompt: str):
+    async def pollination(self, prompt: str, s3_key: str, seed: Optional[int] = None):
         try:
             url = f"https://image.pollinations.ai/prompt/{quote(prompt)}"
             params = {
@@ -222,35 +307,11 @@ class LlmService:
                 "height": DEFAULT_IMAGE_SIZE["height"],
                 "model": DEFAULT_POLLINATIONS_MODEL
             }
+            if seed is not None:
+                params["seed"] = seed
 
-            response = await self.http_client.get(url, params=params)
-
-            # Validate content type before saving
-            content_type = response.headers.get("content-type", "")
-            if not content_type.startswith("image/"):
-                raise HTTPException(
-                    status_code=500,
-                    detail="Image generation failed, please try again"
-                )
-
-            bucket = os.getenv('BUCKET_NAME')
-            region = os.getenv('S3_REGION', 'ap-south-1')
-            filename = f"generated_{hash(prompt)}.png"
-            s3_key = f"{S3_IMAGES_PREFIX}{filename}"
-
-            expected_url = get_s3_url(bucket, s3_key, region)
-
-            if not validate_output_image(expected_url):
-                raise HTTPException(
-                    status_code=500,
-                    detail="Image generation failed, please try again"
-                )
-
-            image_url = upload_bytes_to_s3(
-                data=response.content,
-                key=s3_key,
-                content_type='image/png'
-            )
+            async with self.http_client.stream("GET", url, params=params) as response:
+                image_url = await self._stream_image_to_s3(response, s3_key)
 
             return {"image_url": image_url}
         except HTTPException:
@@ -0,0 +1,321 @@
+import re
+from typing import Dict, List, Tuple
+from app.constants.mermaid import (
+    VALID_MERMAID_STARTS,
+    FLOWCHART_DIRECTIONS,
+    FLOWCHART_SHAPES,
+    FLOWCHART_DIRECTIVES,
+    SEQUENCE_BLOCK_KEYWORDS,
+    SEQUENCE_STATEMENT_KEYWORDS,
+)
+
+# A lightweight line-based checker, not a full Mermaid grammar: it catches
+# the mistakes LLMs actually make (fences and prose around the code, wrong
+# arrows, unquoted labels with brackets, unbalanced blocks), fixes what it
+# safely can and reports the rest with line numbers for a targeted repair.
+
+_FENCE = re.compile(r"^\s*(```|~~~)")
+_INVISIBLE = re.compile("[\u200b\u200c\u200d\u2060\ufeff]")
+_HEADER = re.compile(
+    r"^\s*(" + "|".join(re.escape(start) for start in sorted(VALID_MERMAID_STARTS, key=len, reverse=True)) + r")(?![\w-])"
+)
+
+_LABEL_SPECIAL = frozenset('()[]{}<>|"')
+_FLOWCHART_ARROW_FIXES = [
+    (re.compile(r"\s*(?:\u2192|\u27f6|[\u2013\u2014]+>)\s*"), " --> "),
+    (re.compile(r"(?<![-=<.>])->(?!>)"), "-->"),
+    (re.compile(r"(?<![=<])=>"), "==>"),
+]
+_EDGE_AT_END = re.compile(r"(?:--+[>xo]?|==+>?|-\.+-?>?|~~~)\s*;?\s*$")
+_EDGE_AT_START = re.compile(r"^\s*(?:--|==|-\.|~~~)")
+_STRAY_CLOSER = re.compile(r"[\])}]")
+
+_SEQUENCE_ARROW_FIXES = [
+    (re.compile(r"\s*(?:\u2192|\u27f6|[\u2013\u2014]+>)\s*"), "->>"),
+    (re.compile(r"(?<![-<])=>"), "->>"),
+]
+_ER_RELATIONSHIP = re.compile(r"[|}][|o](?:--|\.\.)[|o][|{]")
+_SEQUENCE_MESSAGE = re.compile(r"^[^:]+?(?:<<-->>|<<->>|-->>|->>|--x|-x|--\)|-\)|-->|->)[+-]?[^:]*")
+
+
+def clean_mermaid(text: str) -> str:
+    """Strip code fences, invisible characters and any prose around the diagram."""
+    lines = _INVISIBLE.sub("", text or "").replace("\r\n", "\n").split("\n")
+
+    fences = [index for index, line in enumerate(lines) if _FENCE.match(line)]
+    if len(fences) >= 2:
+        lines = lines[fences[0] + 1:fences[1]]
+    elif fences:
+        lines = lines[fences[0] + 1:] if fences[0] < len(lines) / 2 else lines[:fences[0]]
+
+    # Drop "Here is your diagram:" style lead-ins before the header
+    start = next((index for index, line in enumerate(lines) if _HEADER.match(line)), 0)
+    return "\n".join(lines[start:]).strip()
+
+
+def diagram_type(code: str) -> str:
+    match = _HEADER.match(code)
+    return match.group(1) if match else ""
+
+
+def repair_mermaid(text: str) -> Tuple[str, List[Dict]]:
+    """Clean and auto-fix LLM output. Returns (code, remaining issues); no issues means valid."""
+    code = clean_mermaid(text)
+    kind = diagram_type(code)
+
+    if not kind:
+        first_line = code.split("\n", 1)[0].strip()
+        return code, [_issue(1, first_line, f"Diagram must start with one of: {', '.join(VALID_MERMAID_STARTS)}")]
+
+    if kind in ("graph", "flowchart"):
+        return _repair_flowchart(code)
+    if kind == "sequenceDiagram":
+        return _repair_sequence(code)
+    return code, _check_generic(code)
+
+
+def _issue(line_number: int, text: str, message: str) -> Dict:
+    return {"line": line_number, "text": text, "message": message}
+
+
+def _is_comment(stripped: str) -> bool:
+    return not stripped or stripped.startswith("%%")
+
+
+def _quote_label(label: str) -> str:
+    stripped = label.strip()
+    if len(stripped) >= 2 and stripped[0] == stripped[-1] == '"':
+        return label
+    if not any(char in _LABEL_SPECIAL for char in stripped):
+        return label
+    return '"' + stripped.replace('"', "#quot;") + '"'
+
+
+def _skip_quoted(line: str, index: int) -> int:
+    """Index just past the string starting at `index`, or -1 if it never closes."""
+    end = line.find('"', index + 1)
+    return -1 if end == -1 else end + 1
+
+
+def _find_closer(line: str, start: int, opener: str, closer: str) -> int:
+    depth, index = 1, start
+    while index < len(line):
+        if line[index] == '"':
+            index = _skip_quoted(line, index)
+            if index == -1:
+                return -1
+            continue
+
+        if len(opener) == 1:
+            # Nested brackets of the same kind stay inside the label
+            if line[index] == opener:
+                depth += 1
+            elif line[index] == closer:
+                depth -= 1
+                if depth == 0:
+                    return index
+        elif line.startswith(closer, index):
+            return index
+        index += 1
+    return -1
+
+
+def _split_flowchart_line(line: str) -> Tuple[List[Tuple[str, str, str, str]], List[str]]:
+    """
+    Split a node/edge statement into ("code", text), ("node", label),
+    ("edge", label), ("quoted", string) and ("shape", v11 `@{...}` body)
+    segments, each as (kind, opener, text, closer).
+    """
+    segments, problems, code = [], [], []
+
+    def flush():
+        if code:
+            segments.append(("code", "", "".join(code), ""))
+            code.clear()
+
+    index = 0
+    while index < len(line):
+        char = line[index]
+
+        if char == "|":
+            end = line.find("|", index + 1)
+            if end == -1:
+                problems.append("Unclosed '|' edge label")
+                break
+            flush()
+            segments.append(("edge", "|", line[index + 1:end], "|"))
+            index = end + 1
+            continue
+
+        follows_id = bool(code) and (code[-1].isalnum() or code[-1] == "_")
+        if follows_id and line.startswith("@{", index):
+            end = _find_closer(line, index + 2, "{", "}")
+            if end == -1:
+                problems.append("Unclosed '@{' in node shape")
+                break
+            flush()
+            segments.append(("shape", "@{", line[index + 2:end], "}"))
+            index = end + 1
+            continue
+
+        if follows_id and char in "[({>":
+            opener, closer = (">", "]") if char == ">" else next(
+                shape for shape in FLOWCHART_SHAPES if line.startswith(shape[0], index)
+            )
+            end = _find_closer(line, index + len(opener), opener, closer)
+            if end == -1:
+                problems.append(f"Unclosed '{opener}' in node label")
+                break
+            flush()
+            segments.append(("node", opener, line[index + len(opener):end], closer))
+            index = end + len(closer)
+            continue
+
+        if char == '"':
+            end = _skip_quoted(line, index)
+            if end == -1:
+                problems.append("Unclosed quote")
+                break
+            flush()
+            segments.append(("quoted", "", line[index:end], ""))
+            index = end
+            continue
+
+        code.append(char)
+        index += 1
+
+    if problems:
+        # Keep the unparsed remainder as-is so nothing is lost
+        code.append(line[index:])
+    flush()
+    return segments, problems
+
+
+def _repair_flowchart(code: str) -> Tuple[str, List[Dict]]:
+    lines = code.split("\n")
+    issues = []
+
+    header = lines[0].replace(";", " ").split()
+    if len(header) > 1 and header[1].upper() in FLOWCHART_DIRECTIONS:
+        lines[0] = lines[0].replace(header[1], header[1].upper(), 1)
+    elif len(header) > 1:
+        issues.append(_issue(1, lines[0].strip(), f"Direction must be one of: {', '.join(FLOWCHART_DIRECTIONS)}"))
+
+    open_subgraphs = []
+    for index in range(1, len(lines)):
+        stripped = lines[index].strip()
+        first_word = stripped.split(" ", 1)[0]
+
+        if _is_comment(stripped) or first_word in FLOWCHART_DIRECTIVES:
+            continue
+        if first_word == "subgraph":
+            open_subgraphs.append(index + 1)
+            continue
+        if stripped == "end":
+            if open_subgraphs:
+                open_subgraphs.pop()
+            else:
+                issues.append(_issue(index + 1, stripped, "'end' without a matching 'subgraph'"))
+            continue
+
+        segments, problems = _split_flowchart_line(lines[index])
+        rebuilt, skeleton = [], []
+        for kind, opener, text, closer in segments:
+            if kind == "code":
+                for pattern, replacement in _FLOWCHART_ARROW_FIXES:
+                    text = pattern.sub(replacement, text)
+                rebuilt.append(text)
+                skeleton.append(text)
+            elif kind in ("quoted", "shape"):
+                # Strings and shape bodies are the author's text, left verbatim
+                rebuilt.append(opener + text + closer)
+                if kind == "quoted":
+                    skeleton.append('""')
+            else:
+                rebuilt.append(opener + _quote_label(text) + closer)
+                if kind == "edge":
+                    skeleton.append(" --> ")
+
+        lines[index] = "".join(rebuilt)
+        skeleton = "".join(skeleton)
+
+        for problem in problems:
+            issues.append(_issue(index + 1, stripped, problem))
+        if problems:
+            continue
+
+        stray = _STRAY_CLOSER.search(skeleton)
+        if stray:
+            issues.append(_issue(index + 1, stripped, f"Unexpected '{stray.group()}'"))
+        if _EDGE_AT_START.match(skeleton):
+            issues.append(_issue(index + 1, stripped, "Edge is missing its source node"))
+        elif _EDGE_AT_END.search(skeleton):
+            issues.append(_issue(index + 1, stripped, "Edge is missing its target node"))
+
+    for line_number in open_subgraphs:
+        issues.append(_issue(line_number, lines[line_number - 1].strip(), "'subgraph' is never closed with 'end'"))
+
+    return "\n".join(lines), issues
+
+
+def _repair_sequence(code: str) -> Tuple[str, List[Dict]]:
+    lines = code.split("\n")
+    issues, open_blocks = [], []
+
+    for index in range(1, len(lines)):
+        stripped = lines[index].strip()
+        first_word = stripped.split(" ", 1)[0].lower()
+
+        if _is_comment(stripped):
+            continue
+        if first_word in SEQUENCE_BLOCK_KEYWORDS:
+            open_blocks.append((index + 1, first_word))
+            continue
+        if stripped == "end":
+            if open_blocks:
+                open_blocks.pop()
+            else:
+                issues.append(_issue(index + 1, stripped, "'end' without an open block"))
+            continue
+        if first_word.rstrip(":") in SEQUENCE_STATEMENT_KEYWORDS:
+            continue
+
+        # Only the arrow part; the message text after ':' is the author's
+        head, colon, text = stripped.partition(":")
+        for pattern, replacement in _SEQUENCE_ARROW_FIXES:
+            head = pattern.sub(replacement, head)
+        fixed = head + colon + text
+
+        if not _SEQUENCE_MESSAGE.match(fixed):
+            issues.append(_issue(index + 1, stripped, "Not a valid sequence diagram statement"))
+        elif ":" not in fixed:
+            issues.append(_issue(index + 1, stripped, "Message is missing ': text'"))
+        lines[index] = lines[index].replace(stripped, fixed)
+
+    for line_number, keyword in open_blocks:
+        issues.append(_issue(line_number, lines[line_number - 1].strip(), f"'{keyword}' block is never closed with 'end'"))
+
+    return "\n".join(lines), issues
+
+
+def _check_generic(code: str) -> List[Dict]:
+    issues, depth = [], 0
+    lines = code.split("\n")
+
+    for index, line in enumerate(lines):
+        stripped = line.strip()
+        if _is_comment(stripped):
+            continue
+        if stripped.count('"') % 2:
+            issues.append(_issue(index + 1, stripped, "Unclosed quote"))
+
+        # Class/ER/state bodies; ER cardinalities like ||--o{ are not blocks
+        line = _ER_RELATIONSHIP.sub("", line)
+        depth += line.count("{") - line.count("}")
+        if depth < 0:
+            issues.append(_issue(index + 1, stripped, "Unexpected '}'"))
+            depth = 0
+
+    if depth > 0:
+        issues.append(_issue(len(lines), lines[-1].strip(), "Unclosed '{' block"))
+    return issues
@@ -3,18 +3,24 @@ from fastapi import HTTPException
 from datetime import datetime
 import logging
 from app.constants.session import SESSION_TYPE_MERMAID
-from app.constants.llm import DEFAULT_PROVIDER, DEFAULT_MODEL
+from app.constants.llm import DEFAULT_PROVIDER, DEFAULT_MODEL, MERMAID_FALLBACK_CONFIGS
+from app.constants.mermaid import MERMAID_HEDGE_AFTER_SECONDS
+from app.helpers.hedging import hedged
+from app.constants.validation import MAX_RETRY_ATTEMPTS
+from app.utils.prompt import get_mermaid_repair_prompt
+from .parser import clean_mermaid, repair_mermaid
 from app.helpers.serializer import serialize_docs
-from app.helpers.validation import validate_prompt, validate_output_mermaid
+from app.helpers.validation import validate_output_mermaid
 
 logger = logging.getLogger(__name__)
 
 class MermaidService:
 
-    def __init__(self, db, llm_service, session_service):
+    def __init__(self, db, llm_service, session_service, moderation_service):
         self.db = db
         self.llm = llm_service
         self.session = session_service
+        self.moderation = moderation_service
 
     async def create_mermaid(self, user, prompt: CreateMermaid):
         try:
@@ -24,7 +30,7 @@ class MermaidService:
             session_id = prompt.session_id
             user_id = user.get("id")
 
-            validate_prompt(prompt_text, intent="mermaid")
+            self.moderation.check_inline(prompt_text, intent="mermaid")
 
             if session_id:
                 try:
@@ -44,11 +50,40 @@ class MermaidService:
                 )
                 session_id = session["id"]
 
-            result = await self.llm.generate_llm_flowchart(prompt_text, provider, model)
+            # The user's model first, MERMAID_FALLBACK_CONFIGS hedge it
+            configs = [{"provider": provider, "model": model}] + [
+                config for config in MERMAID_FALLBACK_CONFIGS
+                if (config["provider"], config["model"]) != (provider, model)
+            ]
 
-            mermaid_code = result.get("mermaid_code", "")
+            def attempt(config):
+                return lambda: self.llm.generate_llm_flowchart(prompt_text, config["provider"], config["model"])
 
-            if not validate_output_mermaid(mermaid_code):
+            index, result = await self.moderation.guard(
+                prompt_text,
+                hedged(
+                    [attempt(config) for config in configs],
+                    lambda result: validate_output_mermaid(clean_mermaid(result.get("mermaid_code", ""))),
+                    MERMAID_HEDGE_AFTER_SECONDS
+                )
+            )
+            provider, model = configs[index]["provider"], configs[index]["model"]
+
+            mermaid_code, issues = repair_mermaid(result.get("mermaid_code", ""))
+
+            # Only what the local fixes could not repair goes back to the LLM
+            for _ in range(MAX_RETRY_ATTEMPTS):
+                if not issues:
+                    break
+                logger.info(f"Repairing {len(issues)} Mermaid syntax issue(s) with {provider}/{model}")
+                repaired = await self.llm.generate_llm_text(
+                    [{"role": "user", "content": get_mermaid_repair_prompt(mermaid_code, issues)}],
+                    provider,
+                    model
+                )
+                mermaid_code, issues = repair_mermaid(repaired)
+
+            if issues or not validate_output_mermaid(mermaid_code):
                 raise HTTPException(
                     status_code=500,
                     detail="LLM failed to generate valid Mermaid diagram syntax. Please try again."
@@ -0,0 +1,110 @@
+import os
+import asyncio
+import logging
+from typing import Dict, List
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+from app.constants.database import (
+    MESSAGE_WRITE_BUFFERED,
+    MESSAGE_WRITE_SYNC,
+    MESSAGE_FLUSH_SECONDS,
+    MESSAGE_BATCH_SIZE,
+    MESSAGE_MAX_PENDING,
+)
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_WRITE_MODE = os.getenv("MESSAGE_WRITE_MODE", MESSAGE_WRITE_BUFFERED)
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+class MessageWriteBuffer:
+    """
+    Write-behind buffer for chat messages. Turns from many requests are
+    grouped into unordered insert_many batches, flushed every
+    MESSAGE_FLUSH_SECONDS, as soon as MESSAGE_BATCH_SIZE messages are
+    waiting, and on shutdown.
+
+    _ids are assigned on add, so a batch retried after a partial failure
+    never duplicates messages. Unflushed messages stay visible through
+    `pending_for` so readers on this worker see their own writes.
+    """
+
+    def __init__(self, db, mode: str = MESSAGE_WRITE_MODE):
+        self.db = db
+        self.mode = mode
+        self._pending: List[Dict] = []
+        self._in_flight: List[Dict] = []
+        self._flush_lock = asyncio.Lock()
+        self._batch_ready = asyncio.Event()
+
+    async def add(self, *messages: Dict):
+        for message in messages:
+            message.setdefault("_id", ObjectId())
+
+        if self.mode == MESSAGE_WRITE_SYNC:
+            await self._insert(list(messages))
+            return
+
+        self._pending.extend(messages)
+        if len(self._pending) >= MESSAGE_BATCH_SIZE:
+            self._batch_ready.set()
+
+    def pending_for(self, session_id: str) -> List[Dict]:
+        return [
+            message for message in self._in_flight + self._pending
+            if message["session_id"] == session_id
+        ]
+
+    async def _insert(self, messages: List[Dict]):
+        try:
+            await self.db.messages.insert_many(messages, ordered=False)
+        except BulkWriteError as e:
+            # Duplicates are messages a previous attempt already wrote
+            errors = [error for error in e.details.get("writeErrors", []) if error.get("code") != DUPLICATE_KEY_ERROR]
+            if errors or e.details.get("writeConcernErrors"):
+                raise
+
+    async def flush(self):
+        async with self._flush_lock:
+            while self._pending:
+                batch = self._pending[:MESSAGE_BATCH_SIZE]
+                del self._pending[:MESSAGE_BATCH_SIZE]
+                self._in_flight = batch
+
+                try:
+                    await self._insert(batch)
+                except asyncio.CancelledError:
+                    # Shutdown mid-write, close() retries the batch
+                    self._requeue(batch)
+                    raise
+                except Exception as e:
+                    logger.error(f"Failed to write {len(batch)} messages, will retry: {str(e)}")
+                    self._requeue(batch)
+                    return
+                finally:
+                    self._in_flight = []
+
+    def _requeue(self, messages: List[Dict]):
+        self._pending[:0] = messages
+
+        overflow = len(self._pending) - MESSAGE_MAX_PENDING
+        if overflow > 0:
+            logger.error(f"Message buffer full, dropping {overflow} oldest messages")
+            del self._pending[:overflow]
+
+    async def run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), MESSAGE_FLUSH_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+            self._batch_ready.clear()
+            await self.flush()
+
+    async def close(self):
+        await self.flush()
+        if self._pending:
+            logger.error(f"Shutting down with {len(self._pending)} unwritten messages")
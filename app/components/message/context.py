@@ -0,0 +1,92 @@
+from datetime import datetime
+from typing import Dict, List
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException
+from app.constants.llm import (
+    CONTEXT_WINDOW_MESSAGES,
+    CONTEXT_CHARS_PER_TOKEN,
+    CONTEXT_RESPONSE_RESERVE_TOKENS,
+    DEFAULT_CONTEXT_TOKENS,
+    MODEL_CONTEXT_TOKENS,
+)
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text or "") // CONTEXT_CHARS_PER_TOKEN + 1
+
+
+def trim_to_budget(messages: List[Dict], model: str, reserved_tokens: int = 0) -> List[Dict]:
+    """Keep the newest messages (chronological input) that fit the model's prompt budget."""
+    budget = MODEL_CONTEXT_TOKENS.get(model, DEFAULT_CONTEXT_TOKENS) - CONTEXT_RESPONSE_RESERVE_TOKENS - reserved_tokens
+
+    kept = []
+    for message in reversed(messages):
+        budget -= estimate_tokens(message["content"])
+        if budget < 0:
+            break
+        kept.append(message)
+
+    kept.reverse()
+    return kept
+
+
+async def load_context_window(
+    db,
+    session_id: str,
+    user_id: str,
+    pending: List[Dict] = (),
+    limit: int = CONTEXT_WINDOW_MESSAGES
+) -> Dict:
+    """
+    Check session ownership and fetch its rolling summary plus the latest
+    `limit` messages not yet covered by it, in one round-trip. `pending`
+    are this worker's not yet persisted messages, appended as the newest.
+    Messages are returned oldest first as {"role", "content"} dicts.
+    """
+    try:
+        session_object_id = ObjectId(session_id)
+    except (InvalidId, TypeError):
+        raise HTTPException(status_code=500, detail=f"Invalid Session Id.")
+
+    result = await db.sessions.aggregate([
+        {"$match": {"_id": session_object_id}},
+        {"$project": {"user_id": 1, "summary": 1, "summary_until": 1}},
+        {"$lookup": {
+            "from": "messages",
+            "let": {
+                "session_id": {"$toString": "$_id"},
+                "summary_until": {"$ifNull": ["$summary_until", datetime.min]}
+            },
+            "pipeline": [
+                {"$match": {"$expr": {"$and": [
+                    {"$eq": ["$session_id", "$$session_id"]},
+                    {"$gt": ["$date", "$$summary_until"]}
+                ]}}},
+                {"$sort": {"date": -1, "_id": -1}},
+                {"$limit": limit},
+                {"$project": {"role": 1, "content": 1, "is_success": 1}}
+            ],
+            "as": "messages"
+        }}
+    ]).to_list(length=1)
+
+    if not result:
+        raise HTTPException(status_code=404, detail="Session Not Found.")
+
+    session = result[0]
+    if session.get("user_id") != user_id:
+        raise HTTPException(status_code=401, detail="User Doesn't have permission to see this Session.")
+
+    # A batch still being flushed can already be in the lookup result
+    fetched_ids = {message["_id"] for message in session["messages"]}
+    pending = [message for message in pending if message["_id"] not in fetched_ids]
+
+    # Failed turns hold error text, not conversation
+    messages = [
+        {"role": message["role"], "content": message["content"]}
+        for message in list(reversed(session["messages"])) + list(pending)
+        if message.get("is_success", True) and message.get("content")
+    ][-limit:]
+
+    return {"summary": session.get("summary"), "messages": messages}
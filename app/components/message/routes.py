@@ -1,9 +1,11 @@
-from fastapi import APIRouter, BackgroundTasks, Depends, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, Request, Query
 from .schema import CreateMessage, MessageResponse, Message
 from .service import MessageService
 from app.helpers.dependencies import get_message_service
-from typing import List
+from typing import Optional
 from app.helpers.auth import check_for_auth
+from app.helpers.pagination import Page
+from app.constants.database import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 router = APIRouter(prefix="/message", tags=["message"], dependencies=[Depends(check_for_auth)])
 
@@ -18,12 +20,14 @@ async def send_message(
     result = await service.send_message(message, background_tasks, user)
     return result
 
-@router.get("/{session_id}", response_model=List[Message])
+@router.get("/{session_id}", response_model=Page[Message])
 async def get_messages(
     session_id: str,
     request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
     service: MessageService = Depends(get_message_service)
 ):
     user = request.state.user
-    result = await service.get_messages(session_id, user.get("id", ""))
+    result = await service.get_messages(session_id, user.get("id", ""), limit, cursor)
     return result
\ No newline at end of file
@@ -24,4 +24,5 @@ class MessageResponse(BaseModel):
     content: str
     role: str
     session_id: str
-    is_success: bool
\ No newline at end of file
+    is_success: bool
+    session_name: Optional[str] = Field(None, description="Provisional name when this message created the session")
\ No newline at end of file
@@ -1,52 +1,93 @@
 from .schema import CreateMessage
 from app.utils.prompt import get_prompt, get_name, get_quick_name
+import asyncio
 from fastapi import HTTPException, BackgroundTasks
 from datetime import datetime
+from bson import ObjectId
 from bson.errors import InvalidId
 import logging
-from app.helpers.validation import validate_prompt
+from app.components.message.context import load_context_window, trim_to_budget, estimate_tokens
+from app.components.message.summary import ConversationSummarizer
+from app.components.message.buffer import MessageWriteBuffer
+from app.core.socket_manager import manager
+from app.constants.session import PROVISIONAL_SESSION_NAME
+from app.helpers.pagination import paginate
+from app.constants.database import DEFAULT_PAGE_SIZE, MESSAGE_WRITE_SYNC
 
 logger = logging.getLogger(__name__)
 
 class MessageService:
 
-    def __init__(self, db, session_service, llm_service):
+    def __init__(self, db, session_service, llm_service, moderation_service):
         self.db = db
         self.session = session_service
         self.llm = llm_service
+        self.moderation = moderation_service
+        self.summarizer = ConversationSummarizer(db, llm_service)
+        self.buffer = MessageWriteBuffer(db)
+        self._naming_tasks = set()
 
     async def save_messages(self, user_data, assistant_data):
         try:
-            await self.db.messages.insert_one(user_data)
-            await self.db.messages.insert_one(assistant_data)
+            await self.buffer.add(user_data, assistant_data)
         except Exception as e:
             logger.error(f"Error saving messages for session {user_data.get('session_id')}: {str(e)}", exc_info=True)
             raise HTTPException(status_code=500, detail="Error saving messages")
 
+    async def _persist_turn(self, background_tasks: BackgroundTasks, user_data, assistant_data):
+        # Sync mode promises the turn is in Mongo before the response is sent
+        if self.buffer.mode == MESSAGE_WRITE_SYNC:
+            await self.save_messages(user_data, assistant_data)
+        else:
+            background_tasks.add_task(self.save_messages, user_data, assistant_data)
+
+    async def name_session(self, session_id: str, user_id: str, message: str):
+        """Replace a provisional session name with an LLM-generated one and push it to the client."""
+        try:
+            session_name = await self.llm.generate_llm_text([{"role": "user", "content": get_name(message)}], "groq", "llama-3.3-70b-versatile")
+            session_name = session_name.strip().strip('"\'')
+            if not session_name:
+                return
+
+            # Keep a name the user set in the meantime
+            result = await self.db.sessions.update_one(
+                {"_id": ObjectId(session_id), "session_name": PROVISIONAL_SESSION_NAME},
+                {"$set": {"session_name": session_name}}
+            )
+
+            if result.modified_count:
+                await manager.send_personal_message(
+                    {"type": "session_renamed", "session_id": session_id, "session_name": session_name},
+                    user_id
+                )
+        except Exception as e:
+            logger.warning(f"Failed to name session {session_id}: {str(e)}")
+
     async def send_message(self, message: CreateMessage, background_tasks: BackgroundTasks, user):
         session_id = message.session_id
         user_id = user.get("id", "")
         provider = user.get("provider")
         model = user.get("model")
 
-        validate_prompt(message.message, intent="chat")
+        self.moderation.check_inline(message.message, intent="chat")
 
-        messages = []
+        messages, summary, session_name = [], None, None
 
         try:
             if session_id:
-                await self.session.check_session(session_id, user_id)
-
-                messages = await self.db.messages.find({"session_id": session_id}).sort("date", 1).limit(10).to_list(None)
+                context = await load_context_window(self.db, session_id, user_id, self.buffer.pending_for(session_id))
+                messages, summary = context["messages"], context["summary"]
             else:
-                session_name = get_quick_name(message.message)
-
-                if session_name is None:
-                    name_prompt = get_name(message.message)
-                    session_name = await self.llm.generate_llm_text([{"role": "user", "content": name_prompt}], "groq", "llama-3.3-70b-versatile")
+                session_name = get_quick_name(message.message) or PROVISIONAL_SESSION_NAME
 
                 session = await self.session.create_session(user_id, session_name, "message")
                 session_id = session["id"]
+
+                # Named by the LLM alongside the answer instead of before it
+                if session_name == PROVISIONAL_SESSION_NAME:
+                    task = asyncio.create_task(self.name_session(session_id, user_id, message.message))
+                    self._naming_tasks.add(task)
+                    task.add_done_callback(self._naming_tasks.discard)
         except Exception as e:
             raise e
 
@@ -60,12 +101,17 @@ class MessageService:
 
         try:
             conversation_messages = []
-            for msg in messages:
-                conversation_messages.append({"role": msg["role"], "content": msg["content"]})
+            if summary:
+                conversation_messages.append({"role": "system", "content": f"Summary of the earlier conversation:\n{summary}"})
 
+            reserved_tokens = estimate_tokens(message.message) + estimate_tokens(summary)
+            conversation_messages += trim_to_budget(messages, model, reserved_tokens)
             conversation_messages.append({"role": "user", "content": message.message})
 
-            response = await self.llm.generate_llm_text(conversation_messages, provider, model)
+            response = await self.moderation.guard(
+                message.message,
+                self.llm.generate_llm_text(conversation_messages, provider, model)
+            )
 
             assistant_data = {
                 "content": response,
@@ -75,13 +121,17 @@ class MessageService:
                 "is_success": True
             }
 
-            background_tasks.add_task(self.save_messages, user_data, assistant_data)
+            await self._persist_turn(background_tasks, user_data, assistant_data)
+            if self.summarizer.needs_summary(messages):
+                # Runs after the messages above are saved
+                background_tasks.add_task(self.summarizer.summarize, session_id)
 
             return {
                 "content": response,
                 "is_success": True,
                 "session_id": session_id, 
-                "role": "assistant"
+                "role": "assistant",
+                "session_name": session_name
             }
         except InvalidId:
             raise HTTPException(status_code=500, detail=f"Invalid Id.")
@@ -94,31 +144,44 @@ class MessageService:
                 "is_success": False
             }
 
-            background_tasks.add_task(self.save_messages, user_data, assistant_data)
+            await self._persist_turn(background_tasks, user_data, assistant_data)
             raise e
         
-    async def get_messages(self, session_id: str, user_id: str):
+    async def get_messages(self, session_id: str, user_id: str, limit: int = DEFAULT_PAGE_SIZE, cursor: str = None):
         try:
             await self.session.check_session(session_id, user_id)
 
-            result = await self.db.messages.aggregate([
-                {
-                    "$match": { "session_id": session_id }
-                },
+            messages, next_cursor = await paginate(
+                self.db.messages,
+                {"session_id": session_id},
+                [("date", 1), ("_id", 1)],
+                limit,
+                cursor,
+                {"role": 1, "session_id": 1, "is_success": 1, "content": 1, "date": 1}
+            )
+
+            # Turns still in the write buffer belong at the end of the last page;
+            # a batch mid-flush may already be in the query result
+            if next_cursor is None:
+                fetched_ids = {message["_id"] for message in messages}
+                messages += [
+                    message for message in self.buffer.pending_for(session_id)
+                    if message["_id"] not in fetched_ids
+                ]
+
+            items = [
                 {
-                    "$project": {
-                        "_id": 0,
-                        "id": { "$toString": "$_id"},
-                        "role": 1,
-                        "session_id": 1,
-                        "is_success": 1,
-                        "content": "$content",
-                        "date": 1
-                    }
+                    "id": str(message["_id"]),
+                    "role": message["role"],
+                    "session_id": message["session_id"],
+                    "is_success": message["is_success"],
+                    "content": message.get("content"),
+                    "date": message["date"]
                 }
-            ]).to_list(length=None)
+                for message in messages
+            ]
 
-            return result
+            return {"items": items, "next_cursor": next_cursor}
         except InvalidId:
             logger.error(f"Invalid ID format in get_messages for session {session_id}")
             raise HTTPException(status_code=500, detail=f"Invalid Id.")
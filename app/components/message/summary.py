@@ -0,0 +1,103 @@
+import asyncio
+import logging
+from typing import Dict, List
+from bson import ObjectId
+from app.utils.prompt import get_summary_prompt
+from app.components.message.context import estimate_tokens
+from app.constants.llm import (
+    CONTEXT_WINDOW_MESSAGES,
+    SUMMARY_PROVIDER,
+    SUMMARY_MODEL,
+    SUMMARY_TRIGGER_TOKENS,
+    SUMMARY_KEEP_RECENT_MESSAGES,
+    SUMMARY_MAX_INPUT_TOKENS,
+    SUMMARY_CONCURRENCY,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ConversationSummarizer:
+    """
+    Folds older turns of a chat session into `sessions.summary` so the
+    prompt for each new message is summary + recent turns, whatever the
+    session length. `sessions.summary_until` is the date of the last
+    message the summary covers; everything after it is sent verbatim.
+    """
+
+    def __init__(self, db, llm_service):
+        self.db = db
+        self.llm = llm_service
+        self._semaphore = asyncio.Semaphore(SUMMARY_CONCURRENCY)
+        self._running = set()
+
+    def needs_summary(self, messages: List[Dict]) -> bool:
+        # A full window means older unsummarized turns are already being dropped
+        if len(messages) >= CONTEXT_WINDOW_MESSAGES:
+            return True
+        return sum(estimate_tokens(message["content"]) for message in messages) > SUMMARY_TRIGGER_TOKENS
+
+    async def summarize(self, session_id: str):
+        """Background task: one summarization pass, skipped if one is already running."""
+        if session_id in self._running:
+            return
+
+        self._running.add(session_id)
+        try:
+            async with self._semaphore:
+                await self._summarize(session_id)
+        except Exception as e:
+            logger.warning(f"Summarization failed for session {session_id}: {str(e)}")
+        finally:
+            self._running.discard(session_id)
+
+    async def _summarize(self, session_id: str):
+        session_object_id = ObjectId(session_id)
+        session = await self.db.sessions.find_one(
+            {"_id": session_object_id},
+            {"summary": 1, "summary_until": 1}
+        )
+        if not session:
+            return
+
+        summary_until = session.get("summary_until")
+        query = {"session_id": session_id}
+        if summary_until:
+            query["date"] = {"$gt": summary_until}
+
+        messages = await self.db.messages.find(
+            query,
+            {"role": 1, "content": 1, "date": 1, "is_success": 1}
+        ).sort([("date", 1), ("_id", 1)]).limit(CONTEXT_WINDOW_MESSAGES + SUMMARY_KEEP_RECENT_MESSAGES).to_list(length=None)
+
+        transcript, covered_until = self._build_transcript(messages[:-SUMMARY_KEEP_RECENT_MESSAGES])
+        if covered_until is None:
+            return
+
+        summary = await self.llm.generate_llm_text(
+            [{"role": "user", "content": get_summary_prompt(session.get("summary"), transcript)}],
+            SUMMARY_PROVIDER,
+            SUMMARY_MODEL
+        )
+
+        # Only apply on top of the summary we read, a concurrent pass on
+        # another worker may already have moved it forward
+        await self.db.sessions.update_one(
+            {"_id": session_object_id, "summary_until": summary_until},
+            {"$set": {"summary": summary.strip(), "summary_until": covered_until}}
+        )
+
+    def _build_transcript(self, messages: List[Dict]):
+        lines, covered_until = [], None
+        budget = SUMMARY_MAX_INPUT_TOKENS
+
+        for message in messages:
+            content = message.get("content")
+            if message.get("is_success", True) and content:
+                budget -= estimate_tokens(content)
+                if budget < 0 and lines:
+                    break
+                lines.append(f"{message['role']}: {content}")
+            covered_until = message["date"]
+
+        return "\n".join(lines), covered_until
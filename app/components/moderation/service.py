@@ -0,0 +1,143 @@
+import asyncio
+import hashlib
+import logging
+import os
+from typing import Awaitable, TypeVar
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from app.helpers.cache import TTLCache
+from app.helpers.validation import validate_prompt
+from app.constants.llm import PROVIDER_GROQ
+from app.constants.validation import (
+    MODERATION_CACHE_TTL_SECONDS,
+    MODERATION_CACHE_MAX_ENTRIES,
+    MODERATION_CLASSIFIER_TIMEOUT_SECONDS,
+    MODERATION_FAIL_OPEN,
+)
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Empty model disables the classifier tier; only the local checks run
+CLASSIFIER_PROVIDER = os.getenv("MODERATION_CLASSIFIER_PROVIDER", PROVIDER_GROQ)
+CLASSIFIER_MODEL = os.getenv("MODERATION_CLASSIFIER_MODEL", "")
+
+FLAGGED_DETAIL = "This request was flagged by content moderation."
+
+T = TypeVar("T")
+
+
+def _prompt_key(*parts: str) -> str:
+    return hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()
+
+
+class ModerationService:
+    """
+    Two moderation tiers, both cached by prompt hash:
+
+    - inline: the local `validate_prompt` checks, run before anything else
+    - classifier: an optional LLM safety model (e.g. Llama Guard), run
+      concurrently with generation by `guard` so it adds no latency unless
+      it is slower than the answer itself
+    """
+
+    def __init__(self, llm_service):
+        self.llm = llm_service
+        self._inline_verdicts = TTLCache(MODERATION_CACHE_TTL_SECONDS, MODERATION_CACHE_MAX_ENTRIES)
+        self._classifier_verdicts = TTLCache(MODERATION_CACHE_TTL_SECONDS, MODERATION_CACHE_MAX_ENTRIES)
+        self._pending = set()
+
+    @property
+    def classifier_enabled(self) -> bool:
+        return bool(CLASSIFIER_MODEL)
+
+    def check_inline(self, prompt: str, intent: str):
+        """Local checks; raises the same HTTPException as `validate_prompt`."""
+        key = _prompt_key(intent, prompt or "")
+        verdict = self._inline_verdicts.get(key)
+
+        if verdict is None:
+            try:
+                validate_prompt(prompt, intent=intent)
+                verdict = ()
+            except HTTPException as e:
+                verdict = (e.status_code, e.detail)
+            self._inline_verdicts.set(key, verdict)
+
+        if verdict:
+            raise HTTPException(status_code=verdict[0], detail=verdict[1])
+
+    async def classify(self, prompt: str) -> bool:
+        """True if the classifier flags the prompt. Fails open (or closed, per MODERATION_FAIL_OPEN)."""
+        key = _prompt_key(prompt)
+        flagged = self._classifier_verdicts.get(key)
+        if flagged is not None:
+            return flagged
+
+        try:
+            result = await self.llm.generate_llm_text(
+                [{"role": "user", "content": prompt}],
+                CLASSIFIER_PROVIDER,
+                CLASSIFIER_MODEL
+            )
+        except Exception as e:
+            logger.warning(f"Moderation classifier failed: {str(e)}")
+            return not MODERATION_FAIL_OPEN
+
+        # Llama Guard answers "safe" or "unsafe\n<categories>"
+        flagged = result.strip().lower().startswith("unsafe")
+        if flagged:
+            logger.info(f"Moderation classifier flagged prompt: {result.strip()!r}")
+
+        self._classifier_verdicts.set(key, flagged)
+        return flagged
+
+    async def guard(self, prompt: str, generation: Awaitable[T]) -> T:
+        """
+        Await `generation` while the classifier checks `prompt`. A flag
+        before the answer is ready cancels the generation, a flag after it
+        withholds the answer; both raise 403.
+        """
+        if not self.classifier_enabled:
+            return await generation
+
+        cached = self._classifier_verdicts.get(_prompt_key(prompt))
+        if cached is not None:
+            if cached:
+                if asyncio.iscoroutine(generation):
+                    generation.close()
+                raise HTTPException(status_code=403, detail=FLAGGED_DETAIL)
+            return await generation
+
+        classifier_task = asyncio.create_task(self.classify(prompt))
+        generation_task = asyncio.ensure_future(generation)
+
+        try:
+            done, _ = await asyncio.wait(
+                {classifier_task, generation_task},
+                return_when=asyncio.FIRST_COMPLETED
+            )
+
+            if classifier_task in done and classifier_task.result():
+                raise HTTPException(status_code=403, detail=FLAGGED_DETAIL)
+
+            result = await generation_task
+
+            if not await self._await_classifier(classifier_task):
+                return result
+            raise HTTPException(status_code=403, detail=FLAGGED_DETAIL)
+        finally:
+            if not generation_task.done():
+                generation_task.cancel()
+            if not classifier_task.done():
+                # Left running so its verdict still lands in the cache
+                self._pending.add(classifier_task)
+                classifier_task.add_done_callback(self._pending.discard)
+
+    async def _await_classifier(self, classifier_task: "asyncio.Task[bool]") -> bool:
+        try:
+            return await asyncio.wait_for(asyncio.shield(classifier_task), MODERATION_CLASSIFIER_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            logger.warning("Moderation classifier timed out")
+            return not MODERATION_FAIL_OPEN
@@ -0,0 +1,72 @@
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from app.helpers.cache import TTLCache
+from app.components.rag.schema import QueryResponse
+from app.constants.rag import (
+    INDEXED_DOCUMENTS_CACHE_TTL_SECONDS,
+    INDEXED_DOCUMENTS_CACHE_MAX_USERS,
+    QUERY_CACHE_TTL_SECONDS,
+    QUERY_CACHE_MAX_ENTRIES,
+)
+
+# user_id -> set of document_ids confirmed as "indexed"
+_indexed_documents = TTLCache(
+    ttl_seconds=INDEXED_DOCUMENTS_CACHE_TTL_SECONDS,
+    max_size=INDEXED_DOCUMENTS_CACHE_MAX_USERS
+)
+
+# user_id -> document-set version, bumped on upload/delete/status change
+_document_versions: Dict[str, int] = {}
+
+_answers = TTLCache(ttl_seconds=QUERY_CACHE_TTL_SECONDS, max_size=QUERY_CACHE_MAX_ENTRIES)
+
+
+def get_indexed_documents(user_id: str) -> Set[str]:
+    return _indexed_documents.get(user_id, set())
+
+
+def remember_indexed_documents(user_id: str, document_ids: Iterable[str]):
+    # Replace rather than merge so no ID outlives its TTL
+    _indexed_documents.set(user_id, set(document_ids))
+
+
+def invalidate_indexed_documents(user_id: str):
+    _indexed_documents.delete(user_id)
+
+
+def document_set_changed(user_id: str):
+    """Call whenever a document of this user is uploaded, deleted or changes status."""
+    invalidate_indexed_documents(user_id)
+    # Old answers become unreachable and age out of the LRU
+    _document_versions[user_id] = _document_versions.get(user_id, 0) + 1
+
+
+def _normalize_query(query: str) -> str:
+    return re.sub(r"\s+", " ", query).strip().rstrip("?!.").lower()
+
+
+def answer_key(user_id: str, query: str, top_k: int, document_ids: Optional[List[str]]) -> Tuple:
+    """
+    Take this once, before retrieval: it pins the document-set version the
+    answer is built from, so an answer racing an upload or delete is stored
+    under the old version and never served for the new one.
+    """
+    return (
+        user_id,
+        _document_versions.get(user_id, 0),
+        _normalize_query(query),
+        top_k,
+        tuple(sorted(set(document_ids or [])))
+    )
+
+
+def get_cached_answer(key: Tuple, query: str) -> Optional[QueryResponse]:
+    cached = _answers.get(key)
+    if cached is None:
+        return None
+    # Echo the caller's wording rather than the first asker's
+    return cached.model_copy(update={"query": query})
+
+
+def cache_answer(key: Tuple, response: QueryResponse):
+    _answers.set(key, response)
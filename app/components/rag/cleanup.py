@@ -0,0 +1,138 @@
+import os
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List
+from app.components.rag.vectorstore import delete_document as delete_document_vectors
+from app.components.rag.cache import document_set_changed
+from app.helpers.retry import async_retry
+from app.utils.s3 import delete_from_s3
+from app.constants.files import S3_DOCUMENTS_PREFIX
+from app.constants.rag import (
+    DOCUMENT_STATUS_DELETING,
+    DELETE_CONCURRENCY,
+    DELETE_RETRY_ATTEMPTS,
+    DELETE_SWEEP_INTERVAL_SECONDS,
+    DELETE_SWEEP_GRACE_SECONDS,
+    DELETE_SWEEP_BATCH_SIZE,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@async_retry(max_attempts=DELETE_RETRY_ATTEMPTS, retry_on=(Exception,))
+async def _delete_vectors(document_id: str, user_id: str) -> int:
+    # Pinecone client is synchronous, keep it off the event loop
+    return await asyncio.to_thread(delete_document_vectors, document_id, user_id)
+
+
+@async_retry(max_attempts=DELETE_RETRY_ATTEMPTS, retry_on=(Exception,))
+async def _delete_s3_object(key: str) -> None:
+    bucket = os.getenv('BUCKET_NAME')
+    deleted = await asyncio.to_thread(delete_from_s3, bucket, key)
+    if not deleted:
+        raise RuntimeError(f"Failed to delete {key} from S3")
+
+
+async def purge_document_storage(document: Dict) -> int:
+    """Remove a document's vectors and S3 object concurrently. Returns chunks deleted."""
+    document_id = document["document_id"]
+
+    tasks = [_delete_vectors(document_id, document["user_id"])]
+
+    if 's3_url' in document:
+        s3_key = f"{S3_DOCUMENTS_PREFIX}{document_id}_{document['filename']}"
+        tasks.append(_delete_s3_object(s3_key))
+
+    results = await asyncio.gather(*tasks)
+    return results[0]
+
+
+async def _purge_many(db, documents: List[Dict]) -> Dict:
+    semaphore = asyncio.Semaphore(DELETE_CONCURRENCY)
+
+    async def purge(document):
+        async with semaphore:
+            return await purge_document_storage(document)
+
+    results = await asyncio.gather(*(purge(doc) for doc in documents), return_exceptions=True)
+
+    deleted, pending, chunks_deleted = [], [], 0
+    for document, result in zip(documents, results):
+        if isinstance(result, Exception):
+            logger.warning(
+                f"Cleanup failed for document {document['document_id']}, left for sweeper: {str(result)}"
+            )
+            pending.append(document["document_id"])
+        else:
+            deleted.append(document["document_id"])
+            chunks_deleted += result or 0
+
+    if deleted:
+        await db.documents.delete_many({
+            "document_id": {"$in": deleted},
+            "status": DOCUMENT_STATUS_DELETING
+        })
+
+    return {"deleted": deleted, "pending": pending, "chunks_deleted": chunks_deleted}
+
+
+async def remove_documents(db, document_ids: List[str], user_id: str) -> Dict:
+    """
+    Idempotently delete documents owned by a user.
+
+    Documents are tombstoned in MongoDB first so they disappear from listings
+    immediately, then vectors and S3 objects are purged in parallel. Anything
+    that still fails after retries keeps its tombstone and is retried by
+    `sweep_deleted_documents`.
+    """
+    document_ids = list(dict.fromkeys(document_ids))
+    ownership_filter = {"document_id": {"$in": document_ids}, "user_id": user_id}
+
+    # Re-deleting an already tombstoned document simply retries its cleanup
+    await db.documents.update_many(
+        {**ownership_filter, "status": {"$ne": DOCUMENT_STATUS_DELETING}},
+        {"$set": {"status": DOCUMENT_STATUS_DELETING, "deleted_at": datetime.utcnow()}}
+    )
+    document_set_changed(user_id)
+
+    documents = await db.documents.find(
+        ownership_filter,
+        {"_id": 0, "document_id": 1, "user_id": 1, "filename": 1, "s3_url": 1}
+    ).to_list(length=None)
+
+    found = {doc["document_id"] for doc in documents}
+    result = await _purge_many(db, documents)
+    result["not_found"] = [doc_id for doc_id in document_ids if doc_id not in found]
+
+    return result
+
+
+async def sweep_deleted_documents(db) -> int:
+    """Retry cleanup for tombstones left behind by partially failed deletes."""
+    cutoff = datetime.utcnow() - timedelta(seconds=DELETE_SWEEP_GRACE_SECONDS)
+
+    documents = await db.documents.find(
+        {"status": DOCUMENT_STATUS_DELETING, "deleted_at": {"$lt": cutoff}},
+        {"_id": 0, "document_id": 1, "user_id": 1, "filename": 1, "s3_url": 1}
+    ).limit(DELETE_SWEEP_BATCH_SIZE).to_list(length=None)
+
+    if not documents:
+        return 0
+
+    result = await _purge_many(db, documents)
+    return len(result["deleted"])
+
+
+async def run_deletion_sweeper(db):
+    while True:
+        try:
+            swept = await sweep_deleted_documents(db)
+            if swept:
+                logger.info(f"Deletion sweeper removed {swept} tombstoned documents")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Deletion sweeper failed: {str(e)}", exc_info=True)
+
+        await asyncio.sleep(DELETE_SWEEP_INTERVAL_SECONDS)
@@ -0,0 +1,21 @@
+from typing import Dict, List
+from app.components.rag.schema import SourceChunk
+
+
+def build_context(search_results: List[Dict]) -> str:
+    return "\n\n".join([
+        f"[Source {i+1} from {result['metadata']['filename']}]:\n{result['chunk_text']}"
+        for i, result in enumerate(search_results)
+    ])
+
+
+def build_sources(search_results: List[Dict]) -> List[SourceChunk]:
+    return [
+        SourceChunk(
+            document_id=result['metadata']['document_id'],
+            filename=result['metadata']['filename'],
+            chunk_text=result['chunk_text'],
+            score=float(result['score'])
+        )
+        for result in search_results
+    ]
@@ -1,8 +1,11 @@
-from fastapi import APIRouter, UploadFile, File, Request, Depends
+from typing import Optional
+from fastapi import APIRouter, UploadFile, File, Request, Depends, Query
+from fastapi.responses import StreamingResponse
 from app.components.rag.service_lambda import RagService
-from app.components.rag.schema import QueryRequest, QueryResponse, DocumentResponse, DeleteResponse
+from app.components.rag.schema import QueryRequest, QueryResponse, DocumentResponse, DeleteResponse, BulkDeleteRequest, BulkDeleteResponse
 from app.helpers.auth import check_for_auth
 from app.helpers.dependencies import get_rag_service
+from app.constants.database import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 router = APIRouter(prefix="/rag", tags=["rag"], dependencies=[Depends(check_for_auth)])
 
@@ -16,7 +19,9 @@ async def upload_document(
     Upload a PDF document for processing
 
     The document is uploaded to S3 and processed asynchronously by Lambda.
-    Use the /rag/documents/{document_id}/status endpoint to check processing status.
+    Status changes are pushed over the /chats/ws/{user_id} WebSocket as
+    `document_status` messages; /rag/documents/{document_id}/status remains
+    available for one-off checks.
     """
     user = request.state.user
     result = await service.upload_file(file, user["id"])
@@ -60,16 +65,43 @@ async def query_documents(
     )
     return result
 
+@router.post("/query/stream")
+async def stream_query_documents(
+    request: Request,
+    query_request: QueryRequest,
+    service: RagService = Depends(get_rag_service)
+):
+    """
+    Query documents using RAG, streamed as server-sent events
+
+    Emits `sources` once retrieval completes, then `token` events as the
+    answer is generated, then `done` (or `error`).
+    """
+    user = request.state.user
+    events = await service.stream_query_documents(
+        query=query_request.query,
+        user_id=user["id"],
+        top_k=query_request.top_k,
+        document_ids=query_request.document_ids
+    )
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/documents")
 async def list_documents(
     request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
     service: RagService = Depends(get_rag_service)
 ):
     """
     List all user documents with their processing status
     """
     user = request.state.user
-    result = await service.list_user_documents(user["id"])
+    result = await service.list_user_documents(user["id"], limit, cursor)
     return result
 
 @router.delete("/documents/{document_id}", response_model=DeleteResponse)
@@ -84,3 +116,19 @@ async def delete_document(
     user = request.state.user
     result = await service.delete_document(document_id, user["id"])
     return result
+
+@router.post("/documents/bulk-delete", response_model=BulkDeleteResponse)
+async def delete_documents(
+    request: Request,
+    delete_request: BulkDeleteRequest,
+    service: RagService = Depends(get_rag_service)
+):
+    """
+    Delete many documents in one request
+
+    Documents are tombstoned immediately and their vectors and S3 objects are
+    removed in parallel. Any cleanup that fails is retried in the background.
+    """
+    user = request.state.user
+    result = await service.delete_documents(delete_request.document_ids, user["id"])
+    return result
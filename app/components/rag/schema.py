@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
+from app.constants.rag import BULK_DELETE_MAX_DOCUMENTS
 
 
 class DocumentUpload(BaseModel):
@@ -50,7 +51,25 @@ class QueryResponse(BaseModel):
     query: str
 
 
+class AgentQueryResponse(QueryResponse):
+    sub_queries: List[str]
+    steps: int
+    verified: bool
+
+
 class DeleteResponse(BaseModel):
     success: bool
     message: str
-    document_id: str
\ No newline at end of file
+    document_id: str
+
+
+class BulkDeleteRequest(BaseModel):
+    document_ids: List[str] = Field(..., min_length=1, max_length=BULK_DELETE_MAX_DOCUMENTS)
+
+
+class BulkDeleteResponse(BaseModel):
+    success: bool
+    message: str
+    deleted: List[str]
+    pending: List[str]  # Tombstoned, storage cleanup will be retried
+    not_found: List[str]
\ No newline at end of file
@@ -1,15 +1,28 @@
 import os
+import json
 import uuid
+import asyncio
+import logging
 import aiofiles
 from datetime import datetime
 from fastapi import UploadFile, HTTPException
 from app.components.rag.document import process_document
-from app.components.rag.vectorstore import add_documents, search_documents, delete_document, get_user_documents, get_embedding
-from app.components.rag.schema import DocumentResponse, QueryResponse, DeleteResponse, SourceChunk
-from app.utils.prompt import get_rag_prompt, query_planner_prompt, query_verifying_prompt, query_summarizing_prompt
-from app.utils.s3 import upload_file_to_s3, get_s3_url, delete_from_s3
+from app.components.rag.vectorstore import add_documents, search_documents, search_by_embedding, get_embeddings
+from app.components.rag.cleanup import remove_documents
+from app.helpers.pagination import paginate
+from app.constants.database import DEFAULT_PAGE_SIZE
+from app.components.rag.cache import answer_key, get_cached_answer, cache_answer, document_set_changed
+from app.components.rag.context import build_context, build_sources
+from app.components.rag.streaming import stream_rag_answer
+from app.components.rag.schema import DocumentResponse, QueryResponse, DeleteResponse, BulkDeleteResponse, AgentQueryResponse
+from app.utils.prompt import get_rag_prompt, query_planner_prompt, query_verifying_prompt, query_summarizing_prompt, planner_replan_prompt
+from app.utils.s3 import upload_file_to_s3, get_s3_url
 from app.constants.files import S3_DOCUMENTS_PREFIX
-from typing import List
+from app.constants.rag import DOCUMENT_STATUS_DELETING, AGENT_MAX_STEPS, AGENT_TIME_BUDGET_SECONDS, AGENT_MAX_SUB_QUERIES
+from app.constants.llm import DEFAULT_PROVIDER, DEFAULT_MODEL
+from typing import List, Dict, Optional, AsyncIterator
+
+logger = logging.getLogger(__name__)
 
 UPLOAD_DIR = "./uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
@@ -75,6 +88,7 @@ class RagService:
                 "s3_url": s3_url
             }
             await self.db.documents.insert_one(document_metadata)
+            document_set_changed(user_id)
 
             return DocumentResponse(
                 success=True,
@@ -91,10 +105,20 @@ class RagService:
                 os.remove(file_path)
             raise HTTPException(status_code=500, detail=f"Error processing document: {str(e)}")
 
+    async def _generate(self, prompt: str) -> str:
+        messages = [{"role": "user", "content": prompt}]
+        return await self.llm_service.generate_llm_text(messages, DEFAULT_PROVIDER, DEFAULT_MODEL)
+
     async def query_documents(self, query: str, user_id: str, top_k: int = 5, document_ids: list = None) -> QueryResponse:
         try:
+            key = answer_key(user_id, query, top_k, document_ids)
+            cached = get_cached_answer(key, query)
+            if cached:
+                return cached
+
             # Search for relevant chunks
-            search_results = search_documents(
+            search_results = await asyncio.to_thread(
+                search_documents,
                 query=query,
                 user_id=user_id,
                 top_k=top_k,
@@ -108,89 +132,167 @@ class RagService:
                     query=query
                 )
 
-            # Prepare context from retrieved chunks
-            context = "\n\n".join([
-                f"[Source {i+1} from {result['metadata']['filename']}]:\n{result['chunk_text']}"
-                for i, result in enumerate(search_results)
-            ])
-
             # Generate answer using LLM with context
-            prompt = get_rag_prompt(query, context)
-            answer = await self.llm_service.generate_llm_text(prompt)
-
-            # Format sources
-            sources = [
-                SourceChunk(
-                    document_id=result['metadata']['document_id'],
-                    filename=result['metadata']['filename'],
-                    chunk_text=result['chunk_text'],
-                    score=float(result['score'])
-                )
-                for result in search_results
-            ]
+            prompt = get_rag_prompt(query, build_context(search_results))
+            answer = await self._generate(prompt)
 
-            return QueryResponse(
+            response = QueryResponse(
                 answer=answer,
-                sources=sources,
+                sources=build_sources(search_results),
                 query=query
             )
+            cache_answer(key, response)
+
+            return response
 
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error querying documents: {str(e)}")
 
-    async def planner_agent(self, query: str):
-        planner_prompt = query_planner_prompt(query)
-
-        planner_response = await self.llm_service.generate_llm_text(planner_prompt, "groq", "llama-3.3-70b-versatile")
+    async def stream_query_documents(self, query: str, user_id: str, top_k: int = 5, document_ids: list = None) -> AsyncIterator[str]:
+        return stream_rag_answer(
+            self.llm_service,
+            query=query,
+            user_id=user_id,
+            top_k=top_k,
+            document_ids=document_ids,
+            no_results_message="I don't have any relevant information to answer your question. Please upload some documents first."
+        )
+
+    def _parse_sub_queries(self, response: str, query: str) -> List[str]:
+        try:
+            start, end = response.index("["), response.rindex("]") + 1
+            parsed = json.loads(response[start:end])
+        except ValueError:
+            logger.warning(f"Planner returned no JSON array, using original query: {response[:200]}")
+            return [query]
 
-        return  planner_response
-    
-    async def verifying_agent(self, prompt: str, data: str):
+        if not isinstance(parsed, list):
+            return [query]
 
-        verifying_prompt = query_verifying_prompt(prompt, data)
+        sub_queries = [item.strip() for item in parsed if isinstance(item, str) and item.strip()]
+        sub_queries = list(dict.fromkeys(sub_queries))[:AGENT_MAX_SUB_QUERIES]
 
-        return verifying_prompt
-    
-    async def retrieval_agent(self, prompt: str, queries: List[str]):
-        flag = False
-        embedding_data = ""
+        return sub_queries or [query]
 
-        for query in queries:
-            if flag:
-                return embedding_data
-            
-            text_to_embedding = get_embedding(query)
+    async def planner_agent(self, query: str, rejected_queries: Optional[List[str]] = None) -> List[str]:
+        if rejected_queries:
+            planner_prompt = planner_replan_prompt(query, json.dumps(rejected_queries))
+        else:
+            planner_prompt = query_planner_prompt(query)
 
-            embeddings_to_data = search_documents(text_to_embedding)
+        planner_response = await self._generate(planner_prompt)
 
-            embedding_data = embeddings_to_data
+        return self._parse_sub_queries(planner_response, query)
 
-            verifying_response = await self.verifying_agent(prompt, embeddings_to_data)
+    async def verifying_agent(self, prompt: str, data: str) -> bool:
+        verifying_prompt = query_verifying_prompt(prompt, data)
 
-            if verifying_response:
-                flag = True
-                continue
-        
-        return ""
-        
+        verifying_response = await self._generate(verifying_prompt)
+
+        return verifying_response.strip().strip(".").lower().startswith("true")
+
+    async def retrieval_agent(
+        self,
+        queries: List[str],
+        user_id: str,
+        top_k: int,
+        document_ids: Optional[List[str]] = None
+    ) -> List[Dict]:
+        # One embedding request for every sub-query, then all searches in parallel
+        embeddings = await asyncio.to_thread(get_embeddings, queries)
+
+        results = await asyncio.gather(*(
+            asyncio.to_thread(search_by_embedding, embedding, user_id, top_k, document_ids)
+            for embedding in embeddings
+        ))
+
+        # Merge sub-query hits, keeping the best score per chunk
+        merged = {}
+        for result in (item for sub_results in results for item in sub_results):
+            existing = merged.get(result["chunk_id"])
+            if existing is None or result["score"] > existing["score"]:
+                merged[result["chunk_id"]] = result
+
+        return sorted(merged.values(), key=lambda result: result["score"], reverse=True)[:top_k]
+
+    async def agent_query_document(
+        self,
+        query: str,
+        user_id: str,
+        top_k: int = 5,
+        document_ids: Optional[List[str]] = None
+    ) -> AgentQueryResponse:
+        if not query:
+            raise HTTPException(status_code=400, detail="Please give an query")
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + AGENT_TIME_BUDGET_SECONDS
+
+        rejected_queries: List[str] = []
+        sub_queries: List[str] = []
+        answer, search_results = "", []
+        verified = False
+        steps = 0
+
+        async def within_budget(coro):
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                coro.close()
+                raise asyncio.TimeoutError()
+            return await asyncio.wait_for(coro, remaining)
 
-    async def agent_query_document(self, query: str):
         try:
-            if not query:
-                raise HTTPException(status_code=404, detail=f"Please give an query")
-            
-            response = await self.planner_agent(query)
+            while steps < AGENT_MAX_STEPS:
+                steps += 1
+
+                sub_queries = await within_budget(self.planner_agent(query, rejected_queries))
+                step_results = await within_budget(
+                    self.retrieval_agent(sub_queries, user_id, top_k, document_ids)
+                )
+
+                if not step_results:
+                    rejected_queries.extend(sub_queries)
+                    continue
+
+                search_results = step_results
+                prompt = get_rag_prompt(query, build_context(search_results))
+                answer = await within_budget(self._generate(prompt))
 
-            embedding_answer = await self.retrieval_agent(query, response)
+                verified = await within_budget(self.verifying_agent(query, answer))
+                if verified:
+                    break
 
+                rejected_queries.extend(sub_queries)
 
+            if answer and not verified:
+                answer = await within_budget(self._generate(query_summarizing_prompt(query, answer)))
 
+        except asyncio.TimeoutError:
+            logger.warning(f"Agent query hit its {AGENT_TIME_BUDGET_SECONDS}s budget after {steps} steps")
+            if not answer:
+                raise HTTPException(status_code=504, detail="Agent query timed out. Try a simpler question.")
+        except HTTPException:
+            raise
         except Exception as e:
+            logger.error(f"Error in agent query: {str(e)}", exc_info=True)
             raise HTTPException(status_code=500, detail=f"Error getting response: {str(e)}")
 
-    async def list_user_documents(self, user_id: str):
+        if not search_results:
+            answer = "I don't have any relevant information to answer your question. Please upload some documents first."
+
+        return AgentQueryResponse(
+            answer=answer,
+            sources=build_sources(search_results),
+            query=query,
+            sub_queries=sub_queries,
+            steps=steps,
+            verified=verified
+        )
+
+    async def list_user_documents(self, user_id: str, limit: int = DEFAULT_PAGE_SIZE, cursor: str = None):
         try:
-            documents = await self.db.documents.find({"user_id": user_id}).to_list(length=None)
+            query = {"user_id": user_id, "status": {"$ne": DOCUMENT_STATUS_DELETING}}
+            documents, next_cursor = await paginate(self.db.documents, query, [("_id", 1)], limit, cursor)
 
             # Format response
             formatted_docs = []
@@ -205,38 +307,51 @@ class RagService:
                     "status": doc["status"]
                 })
 
-            return {"documents": formatted_docs, "total": len(formatted_docs)}
+            return {
+                "documents": formatted_docs,
+                "total": await self.db.documents.count_documents(query),
+                "next_cursor": next_cursor
+            }
 
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error listing documents: {str(e)}")
 
     async def delete_document(self, document_id: str, user_id: str) -> DeleteResponse:
         try:
-            # Verify document belongs to user
-            document = await self.db.documents.find_one({"document_id": document_id, "user_id": user_id})
+            result = await remove_documents(self.db, [document_id], user_id)
 
-            if not document:
+            if result["not_found"]:
                 raise HTTPException(status_code=404, detail="Document not found or access denied")
 
-            # Delete from vector store
-            chunks_deleted = delete_document(document_id, user_id)
-
-            # Delete from MongoDB
-            await self.db.documents.delete_one({"document_id": document_id})
-
-            if 's3_url' in document:
-                bucket = os.getenv('BUCKET_NAME')
-                unique_filename = f"{document_id}_{document['filename']}"
-                s3_key = f"{S3_DOCUMENTS_PREFIX}{unique_filename}"
-                delete_from_s3(bucket, s3_key)
+            if result["pending"]:
+                message = "Document deleted. Storage cleanup will be retried in the background."
+            else:
+                message = f"Document deleted successfully. Removed {result['chunks_deleted']} chunks."
 
             return DeleteResponse(
                 success=True,
-                message=f"Document deleted successfully. Removed {chunks_deleted} chunks.",
+                message=message,
                 document_id=document_id
             )
 
         except HTTPException:
             raise
         except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Error deleting document: {str(e)}")
\ No newline at end of file
+            raise HTTPException(status_code=500, detail=f"Error deleting document: {str(e)}")
+
+    async def delete_documents(self, document_ids: List[str], user_id: str) -> BulkDeleteResponse:
+        try:
+            result = await remove_documents(self.db, document_ids, user_id)
+
+            return BulkDeleteResponse(
+                success=not result["not_found"],
+                message=f"Deleted {len(result['deleted']) + len(result['pending'])} documents. Removed {result['chunks_deleted']} chunks.",
+                deleted=result["deleted"],
+                pending=result["pending"],
+                not_found=result["not_found"]
+            )
+
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error deleting documents: {str(e)}")
\ No newline at end of file
@@ -1,13 +1,29 @@
 import os
 import uuid
+import asyncio
 import aiofiles
 from datetime import datetime
 from fastapi import UploadFile, HTTPException
-from app.components.rag.schema import DocumentResponse, QueryResponse, DeleteResponse, SourceChunk
+from typing import List, AsyncIterator
+from app.components.rag.schema import DocumentResponse, QueryResponse, DeleteResponse, BulkDeleteResponse, SourceChunk
 from app.utils.prompt import get_rag_prompt
-from app.utils.s3 import upload_file_to_s3, get_s3_url, delete_from_s3
+from app.utils.s3 import upload_file_to_s3, get_s3_url
 from app.constants.files import S3_DOCUMENTS_PREFIX
-from app.components.rag.vectorstore import search_documents, delete_document
+from app.constants.rag import DOCUMENT_STATUS_INDEXED, DOCUMENT_STATUS_DELETING
+from app.constants.llm import DEFAULT_PROVIDER, DEFAULT_MODEL
+from app.components.rag.vectorstore import search_documents
+from app.components.rag.cleanup import remove_documents
+from app.components.rag.streaming import stream_rag_answer
+from app.helpers.pagination import paginate
+from app.constants.database import DEFAULT_PAGE_SIZE
+from app.components.rag.cache import (
+    get_indexed_documents,
+    remember_indexed_documents,
+    answer_key,
+    get_cached_answer,
+    cache_answer,
+    document_set_changed,
+)
 
 # Temporary directory (only for file upload buffer)
 UPLOAD_DIR = "./uploads"
@@ -98,6 +114,7 @@ class RagService:
                 "s3_url": s3_url
             }
             await self.db.documents.insert_one(document_metadata)
+            document_set_changed(user_id)
 
             print(f"Document metadata saved to MongoDB: {document_id}")
 
@@ -154,6 +171,34 @@ class RagService:
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error fetching document status: {str(e)}")
 
+    async def _ensure_documents_indexed(self, document_ids: List[str], user_id: str):
+        """
+        Verify all requested documents belong to the user and are indexed,
+        using the per-user cache or a single $in query.
+        """
+        requested = set(document_ids)
+        if requested <= get_indexed_documents(user_id):
+            return
+
+        documents = await self.db.documents.find(
+            {"document_id": {"$in": list(requested)}, "user_id": user_id},
+            {"_id": 0, "document_id": 1, "status": 1}
+        ).to_list(length=None)
+        statuses = {doc["document_id"]: doc["status"] for doc in documents}
+
+        # Report in request order, same as the old per-document checks
+        for doc_id in document_ids:
+            status = statuses.get(doc_id)
+            if status is None or status == DOCUMENT_STATUS_DELETING:
+                raise HTTPException(status_code=404, detail=f"Document {doc_id} not found")
+            if status != DOCUMENT_STATUS_INDEXED:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Document {doc_id} is still processing. Status: {status}"
+                )
+
+        remember_indexed_documents(user_id, requested)
+
     async def query_documents(self, query: str, user_id: str, top_k: int = 5, document_ids: list = None) -> QueryResponse:
         """
         Query documents using RAG
@@ -161,24 +206,17 @@ class RagService:
         Note: Only queries documents with status="indexed"
         """
         try:
-            # Check if user has any indexed documents
             if document_ids:
-                # Verify all requested documents are indexed
-                for doc_id in document_ids:
-                    doc = await self.db.documents.find_one({
-                        "document_id": doc_id,
-                        "user_id": user_id
-                    })
-                    if not doc:
-                        raise HTTPException(status_code=404, detail=f"Document {doc_id} not found")
-                    if doc["status"] != "indexed":
-                        raise HTTPException(
-                            status_code=400,
-                            detail=f"Document {doc_id} is still processing. Status: {doc['status']}"
-                        )
+                await self._ensure_documents_indexed(document_ids, user_id)
+
+            key = answer_key(user_id, query, top_k, document_ids)
+            cached = get_cached_answer(key, query)
+            if cached:
+                return cached
 
             # Search for relevant chunks
-            search_results = search_documents(
+            search_results = await asyncio.to_thread(
+                search_documents,
                 query=query,
                 user_id=user_id,
                 top_k=top_k,
@@ -200,7 +238,11 @@ class RagService:
 
             # Generate answer using LLM with context
             prompt = get_rag_prompt(query, context)
-            answer = await self.llm_service.generate_llm_text(prompt)
+            answer = await self.llm_service.generate_llm_text(
+                [{"role": "user", "content": prompt}],
+                DEFAULT_PROVIDER,
+                DEFAULT_MODEL
+            )
 
             # Format sources
             sources = [
@@ -213,23 +255,46 @@ class RagService:
                 for result in search_results
             ]
 
-            return QueryResponse(
+            response = QueryResponse(
                 answer=answer,
                 sources=sources,
                 query=query
             )
+            cache_answer(key, response)
+
+            return response
 
         except HTTPException:
             raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error querying documents: {str(e)}")
 
-    async def list_user_documents(self, user_id: str):
+    async def stream_query_documents(self, query: str, user_id: str, top_k: int = 5, document_ids: list = None) -> AsyncIterator[str]:
+        """
+        Streaming variant of query_documents (server-sent events)
+
+        Document status is validated before the stream starts so errors still
+        map to HTTP status codes.
         """
-        List all documents for a user with their processing status
+        if document_ids:
+            await self._ensure_documents_indexed(document_ids, user_id)
+
+        return stream_rag_answer(
+            self.llm_service,
+            query=query,
+            user_id=user_id,
+            top_k=top_k,
+            document_ids=document_ids,
+            no_results_message="I don't have any relevant information to answer your question. Please upload some documents first or wait for documents to finish processing."
+        )
+
+    async def list_user_documents(self, user_id: str, limit: int = DEFAULT_PAGE_SIZE, cursor: str = None):
+        """
+        List a page of the user's documents with their processing status
         """
         try:
-            documents = await self.db.documents.find({"user_id": user_id}).to_list(length=None)
+            query = {"user_id": user_id, "status": {"$ne": DOCUMENT_STATUS_DELETING}}
+            documents, next_cursor = await paginate(self.db.documents, query, [("_id", 1)], limit, cursor)
 
             # Format response
             formatted_docs = []
@@ -246,19 +311,28 @@ class RagService:
                     "processed_at": doc.get("processed_at")
                 })
 
-            # Group by status for summary
+            # Summary covers every document, not just this page
+            counts = await self.db.documents.aggregate([
+                {"$match": query},
+                {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+            ]).to_list(length=None)
+            counts = {entry["_id"]: entry["count"] for entry in counts}
+
             status_counts = {
-                "processing": len([d for d in formatted_docs if d["status"] == "processing"]),
-                "indexed": len([d for d in formatted_docs if d["status"] == "indexed"]),
-                "error": len([d for d in formatted_docs if d["status"] == "error"])
+                "processing": counts.get("processing", 0),
+                "indexed": counts.get("indexed", 0),
+                "error": counts.get("error", 0)
             }
 
             return {
                 "documents": formatted_docs,
-                "total": len(formatted_docs),
-                "status_summary": status_counts
+                "total": sum(counts.values()),
+                "status_summary": status_counts,
+                "next_cursor": next_cursor
             }
 
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error listing documents: {str(e)}")
 
@@ -267,36 +341,19 @@ class RagService:
         Delete document from vector store, MongoDB, and S3
         """
         try:
-            # Verify document belongs to user
-            document = await self.db.documents.find_one({"document_id": document_id, "user_id": user_id})
+            result = await remove_documents(self.db, [document_id], user_id)
 
-            if not document:
+            if result["not_found"]:
                 raise HTTPException(status_code=404, detail="Document not found or access denied")
 
-            # Delete from vector store (only if status is indexed)
-            chunks_deleted = 0
-            if document["status"] == "indexed":
-                try:
-                    chunks_deleted = delete_document(document_id, user_id)
-                except Exception as e:
-                    print(f"Warning: Failed to delete from vector store: {str(e)}")
-
-            # Delete from MongoDB
-            await self.db.documents.delete_one({"document_id": document_id})
-
-            # Delete from S3
-            if 's3_url' in document:
-                try:
-                    bucket = os.getenv('BUCKET_NAME')
-                    unique_filename = f"{document_id}_{document['filename']}"
-                    s3_key = f"{S3_DOCUMENTS_PREFIX}{unique_filename}"
-                    delete_from_s3(bucket, s3_key)
-                except Exception as e:
-                    print(f"Warning: Failed to delete from S3: {str(e)}")
+            if result["pending"]:
+                message = "Document deleted. Storage cleanup will be retried in the background."
+            else:
+                message = f"Document deleted successfully. Removed {result['chunks_deleted']} chunks."
 
             return DeleteResponse(
                 success=True,
-                message=f"Document deleted successfully. Removed {chunks_deleted} chunks.",
+                message=message,
                 document_id=document_id
             )
 
@@ -304,3 +361,21 @@ class RagService:
             raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error deleting document: {str(e)}")
+
+    async def delete_documents(self, document_ids: List[str], user_id: str) -> BulkDeleteResponse:
+        """
+        Delete many documents at once, purging storage in parallel
+        """
+        try:
+            result = await remove_documents(self.db, document_ids, user_id)
+
+            return BulkDeleteResponse(
+                success=not result["not_found"],
+                message=f"Deleted {len(result['deleted']) + len(result['pending'])} documents. Removed {result['chunks_deleted']} chunks.",
+                deleted=result["deleted"],
+                pending=result["pending"],
+                not_found=result["not_found"]
+            )
+
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error deleting documents: {str(e)}")
@@ -0,0 +1,161 @@
+import asyncio
+import logging
+from typing import Dict
+from pymongo.errors import OperationFailure, PyMongoError
+from app.components.rag.cache import document_set_changed
+from app.constants.rag import (
+    DOCUMENT_STATUS_PROCESSING,
+    DOCUMENT_STATUS_DELETING,
+    STATUS_NOTIFY_COALESCE_SECONDS,
+    STATUS_POLL_INTERVAL_SECONDS,
+    STATUS_WATCH_RETRY_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+# "$changeStream stage is only supported on replica sets"
+CHANGE_STREAM_UNSUPPORTED_CODES = (40573,)
+
+STATUS_FIELDS = {
+    "_id": 0,
+    "document_id": 1,
+    "user_id": 1,
+    "filename": 1,
+    "status": 1,
+    "chunk_count": 1,
+    "processed_at": 1,
+    "error_message": 1,
+}
+
+
+class DocumentStatusNotifier:
+    """
+    Pushes document status transitions (e.g. processing -> indexed) to users
+    over the WebSocket ConnectionManager, so clients don't have to poll
+    /rag/documents/{document_id}/status.
+
+    Uses a MongoDB change stream when available and falls back to a single
+    shared polling query for standalone servers. Events are coalesced per
+    user into one `document_status` message.
+    """
+
+    def __init__(self, db, connection_manager):
+        self.db = db
+        self.manager = connection_manager
+        self._pending: Dict[str, Dict[str, dict]] = {}
+        self._flush_tasks: Dict[str, asyncio.Task] = {}
+
+    async def run(self):
+        try:
+            await self._watch()
+        except OperationFailure as e:
+            if e.code not in CHANGE_STREAM_UNSUPPORTED_CODES:
+                raise
+            logger.info("Change streams not supported by MongoDB server, polling document status instead")
+            await self._poll()
+
+    async def _watch(self):
+        pipeline = [
+            {"$match": {
+                "$or": [
+                    {"operationType": {"$in": ["insert", "replace"]}},
+                    {"operationType": "update", "updateDescription.updatedFields.status": {"$exists": True}}
+                ]
+            }},
+            {"$project": {f"fullDocument.{field}": 1 for field in STATUS_FIELDS if field != "_id"}}
+        ]
+        resume_token = None
+
+        while True:
+            try:
+                async with self.db.documents.watch(
+                    pipeline,
+                    full_document="updateLookup",
+                    resume_after=resume_token
+                ) as stream:
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        document = change.get("fullDocument")
+                        if document:
+                            self.publish(document)
+            except OperationFailure as e:
+                if e.code in CHANGE_STREAM_UNSUPPORTED_CODES:
+                    raise
+                logger.warning(f"Document change stream failed, retrying: {str(e)}")
+            except PyMongoError as e:
+                logger.warning(f"Document change stream interrupted, retrying: {str(e)}")
+
+            await asyncio.sleep(STATUS_WATCH_RETRY_SECONDS)
+
+    async def _poll(self):
+        # document_id -> last seen status, for documents still processing
+        tracked: Dict[str, str] = {}
+
+        while True:
+            try:
+                user_ids = list(self.manager.active_connections)
+                if user_ids:
+                    documents = await self.db.documents.find(
+                        {
+                            "user_id": {"$in": user_ids},
+                            "$or": [
+                                {"status": DOCUMENT_STATUS_PROCESSING},
+                                {"document_id": {"$in": list(tracked)}}
+                            ]
+                        },
+                        STATUS_FIELDS
+                    ).to_list(length=None)
+
+                    next_tracked = {}
+                    for document in documents:
+                        previous = tracked.get(document["document_id"])
+                        if previous is not None and previous != document["status"]:
+                            self.publish(document)
+                        if document["status"] == DOCUMENT_STATUS_PROCESSING:
+                            next_tracked[document["document_id"]] = document["status"]
+                    tracked = next_tracked
+                else:
+                    tracked = {}
+            except Exception as e:
+                logger.error(f"Document status polling failed: {str(e)}", exc_info=True)
+
+            await asyncio.sleep(STATUS_POLL_INTERVAL_SECONDS)
+
+    def publish(self, document: dict):
+        user_id = document.get("user_id")
+        status = document.get("status")
+        if not user_id or not status:
+            return
+
+        # Also reaches other workers, keeping their RAG caches consistent
+        document_set_changed(user_id)
+
+        # Deletes are user-initiated and already answered over HTTP
+        if status == DOCUMENT_STATUS_DELETING or user_id not in self.manager.active_connections:
+            return
+
+        # Latest status per document wins within the coalescing window
+        self._pending.setdefault(user_id, {})[document["document_id"]] = {
+            key: document.get(key) for key in STATUS_FIELDS if key not in ("_id", "user_id")
+        }
+
+        if user_id not in self._flush_tasks:
+            self._flush_tasks[user_id] = asyncio.create_task(self._flush(user_id))
+
+    async def _flush(self, user_id: str):
+        try:
+            await asyncio.sleep(STATUS_NOTIFY_COALESCE_SECONDS)
+        finally:
+            self._flush_tasks.pop(user_id, None)
+            documents = list(self._pending.pop(user_id, {}).values())
+
+        if not documents:
+            return
+
+        try:
+            await self.manager.send_personal_message(
+                {"type": "document_status", "documents": documents},
+                user_id
+            )
+        except Exception as e:
+            logger.warning(f"Failed to push document status to user {user_id}: {str(e)}")
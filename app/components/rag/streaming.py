@@ -0,0 +1,73 @@
+import asyncio
+import logging
+from typing import AsyncIterator, List, Optional
+from fastapi import HTTPException
+from app.components.rag.vectorstore import search_documents
+from app.components.rag.context import build_context, build_sources
+from app.components.rag.cache import answer_key, get_cached_answer, cache_answer
+from app.components.rag.schema import QueryResponse
+from app.helpers.sse import format_sse
+from app.utils.prompt import get_rag_prompt
+from app.constants.llm import DEFAULT_PROVIDER, DEFAULT_MODEL
+
+logger = logging.getLogger(__name__)
+
+
+async def stream_rag_answer(
+    llm_service,
+    query: str,
+    user_id: str,
+    top_k: int,
+    document_ids: Optional[List[str]],
+    no_results_message: str
+) -> AsyncIterator[str]:
+    """
+    Server-sent events for a RAG query: `sources` as soon as retrieval
+    finishes, then `token` events as the LLM streams, then `done`.
+    Failures after the stream has started are reported as an `error` event.
+    """
+    try:
+        key = answer_key(user_id, query, top_k, document_ids)
+        cached = get_cached_answer(key, query)
+        if cached:
+            yield format_sse("sources", cached.sources)
+            yield format_sse("token", {"text": cached.answer})
+            yield format_sse("done", {"cached": True})
+            return
+
+        search_results = await asyncio.to_thread(
+            search_documents,
+            query=query,
+            user_id=user_id,
+            top_k=top_k,
+            document_ids=document_ids
+        )
+
+        sources = build_sources(search_results)
+        yield format_sse("sources", sources)
+
+        if not search_results:
+            yield format_sse("token", {"text": no_results_message})
+            yield format_sse("done", {"cached": False})
+            return
+
+        messages = [{"role": "user", "content": get_rag_prompt(query, build_context(search_results))}]
+        answer_parts = []
+
+        async for text in llm_service.stream_llm_text(messages, DEFAULT_PROVIDER, DEFAULT_MODEL):
+            answer_parts.append(text)
+            yield format_sse("token", {"text": text})
+
+        cache_answer(key, QueryResponse(
+            answer="".join(answer_parts),
+            sources=sources,
+            query=query
+        ))
+
+        yield format_sse("done", {"cached": False})
+
+    except HTTPException as e:
+        yield format_sse("error", {"status_code": e.status_code, "detail": e.detail})
+    except Exception as e:
+        logger.error(f"Error streaming RAG answer: {str(e)}", exc_info=True)
+        yield format_sse("error", {"status_code": 500, "detail": f"Error querying documents: {str(e)}"})
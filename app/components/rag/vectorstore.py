@@ -79,6 +79,42 @@ def add_documents(
     return len(chunks)
 
 
+def get_embeddings(texts: List[str]) -> List[List[float]]:
+    """Embed several texts with a single HuggingFace request."""
+    try:
+        if not HUGGINGFACE_API_KEY:
+            raise HTTPException(
+                status_code=500,
+                detail="HUGGINGFACE_API_KEY not configured in environment"
+            )
+
+        response = requests.post(
+            f"https://api-inference.huggingface.co/models/{EMBEDDING_MODEL}",
+            headers={"Authorization": f"Bearer {HUGGINGFACE_API_KEY}"},
+            json={"inputs": texts}
+        )
+        response.raise_for_status()
+
+        result = response.json()
+        if not isinstance(result, list) or len(result) != len(texts):
+            raise ValueError("Unexpected embedding response shape")
+
+        return result
+
+    except HTTPException:
+        raise
+    except requests.exceptions.ConnectionError:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Cannot connect to HuggingFace API. Please check your internet connection."
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error generating embeddings: {str(e)}"
+        )
+
+
 def search_documents(
     query: str,
     user_id: str,
@@ -88,6 +124,15 @@ def search_documents(
     # Generate embedding for the query
     query_embedding = get_embedding(query)
 
+    return search_by_embedding(query_embedding, user_id, top_k, document_ids)
+
+
+def search_by_embedding(
+    query_embedding: List[float],
+    user_id: str,
+    top_k: int = 5,
+    document_ids: Optional[List[str]] = None
+) -> List[Dict]:
     # Build filter for user_id and optional document_ids
     filter_dict = {"user_id": {"$eq": user_id}}
 
@@ -1,20 +1,24 @@
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, Request, Query
 from app.helpers.auth import check_for_auth
 from app.helpers.dependencies import get_session_service
 from .service import SessionService
 from .schema import SessionResponse, UpdateSession
-from typing import List
+from typing import Optional
+from app.helpers.pagination import Page
+from app.constants.database import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 router = APIRouter(prefix="/session", tags=["session"], dependencies=[Depends(check_for_auth)])
 
-@router.get("/", response_model=List[SessionResponse])
+@router.get("/", response_model=Page[SessionResponse])
 async def get_sessions(
     request: Request,
     type: str,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
     service: SessionService = Depends(get_session_service)
 ):
     user = request.state.user
-    result = await service.fetch_sessions(user, type)
+    result = await service.fetch_sessions(user, type, limit, cursor)
     return result
 
 @router.post("/")
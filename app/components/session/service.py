@@ -1,6 +1,8 @@
 from fastapi import HTTPException
 from bson import ObjectId
 from app.helpers.serializer import serialize_doc, serialize_docs
+from app.helpers.pagination import paginate
+from app.constants.database import DEFAULT_PAGE_SIZE
 from bson.errors import InvalidId
 from .schema import UpdateSession
 from datetime import datetime, timezone
@@ -13,10 +15,18 @@ class SessionService:
     def __init__(self, db):
         self.db = db
 
-    async def fetch_sessions(self, user, type: str):
+    async def fetch_sessions(self, user, type: str, limit: int = DEFAULT_PAGE_SIZE, cursor: str = None):
         try:
-            result = await self.db.sessions.find({"user_id": user.get("id", ""), "type": type}).sort("date", 1).to_list(length=None)
-            return serialize_docs(result)
+            result, next_cursor = await paginate(
+                self.db.sessions,
+                {"user_id": user.get("id", ""), "type": type},
+                [("date", 1), ("_id", 1)],
+                limit,
+                cursor
+            )
+            return {"items": serialize_docs(result), "next_cursor": next_cursor}
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error fetching sessions for user {user.get('id')}: {str(e)}", exc_info=True)
             raise HTTPException(status_code=500, detail="Error Fetching Sessions.")
@@ -38,14 +48,14 @@ class SessionService:
 
     async def create_session(self, user_id, session_name: str, type: str):
         try:
-            session = await self.db.sessions.insert_one({
+            session = {
                 "user_id": user_id,
                 "session_name": session_name,
                 "date": datetime.utcnow(),
                 "type": type
-            })
-            result = await self.fetch_session_by_id(str(session.inserted_id))
-            return result
+            }
+            await self.db.sessions.insert_one(session)
+            return serialize_doc(session)
         except HTTPException:
             raise
         except Exception as e:
@@ -4,6 +4,8 @@ from .schema import User, UserCreate, UserUpdate, UserPatchUpdate, UserFilterRes
 from .service import UserService
 from app.helpers.auth import check_for_auth
 from app.helpers.dependencies import get_user_service
+from app.helpers.pagination import Page
+from app.constants.database import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from typing import Optional
 
 router = APIRouter(prefix="/users", tags=["users"], dependencies=[Depends(check_for_auth)])
@@ -14,10 +16,15 @@ async def create_user(user: UserCreate, service: UserService = Depends(get_user_
     return result
 
 
-@router.get("/", response_model=List[UserFilterResponse])
-async def get_all_users(search: Optional[str] = Query(None), service: UserService = Depends(get_user_service)):
+@router.get("/", response_model=Page[UserFilterResponse])
+async def get_all_users(
+    search: Optional[str] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    service: UserService = Depends(get_user_service)
+):
     search = search.strip() if search else None
-    result = await service.fetch_users(search)
+    result = await service.fetch_users(search, limit, cursor)
     return result
 
 
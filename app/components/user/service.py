@@ -3,6 +3,9 @@ from fastapi import HTTPException
 from bson import ObjectId
 import logging
 from app.helpers.serializer import serialize_docs
+from app.helpers.pagination import paginate
+from app.constants.database import DEFAULT_PAGE_SIZE
+from app.helpers.auth import invalidate_user_cache, revoke_user_tokens
 import re
 
 # Setup logger
@@ -60,6 +63,11 @@ class UserService:
             user_dict = user.model_dump(exclude_unset=True)
 
             await self.db.users.update_one({"_id": ObjectId(user_id)}, {"$set": user_dict})
+            invalidate_user_cache(user_id)
+
+            # Disabling an account kills its live tokens on every worker
+            if "status" in user_dict:
+                await revoke_user_tokens(user_id, active=user_dict["status"] != "active")
 
             return await self.fetch_user(str(user_id))
         except HTTPException:
@@ -68,7 +76,7 @@ class UserService:
             logger.error(f"Failed to update user {user_id}: {str(e)}", exc_info=True)
             raise HTTPException(status_code=500, detail=f"Failed to update user: {str(e)}")
         
-    async def fetch_users(self, search):
+    async def fetch_users(self, search, limit: int = DEFAULT_PAGE_SIZE, cursor: str = None):
         try:
             query = {}
             if search:
@@ -80,8 +88,17 @@ class UserService:
                     ]
                 }
 
-            users = await self.db.users.find(query).to_list(length=None)
+            users, next_cursor = await paginate(
+                self.db.users,
+                query,
+                [("_id", 1)],
+                limit,
+                cursor,
+                {"user_name": 1, "email": 1}
+            )
 
-            return serialize_docs(users)
+            return {"items": serialize_docs(users), "next_cursor": next_cursor}
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to fetch users: {str(e)}")
\ No newline at end of file
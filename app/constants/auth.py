@@ -1,3 +1,35 @@
 # JWT Settings
 JWT_ALGORITHM = "HS256"
-JWT_EXPIRE_MINUTES = 1440  # 24 hours
\ No newline at end of file
+JWT_EXPIRE_MINUTES = 15  # Short-lived access tokens
+JWT_REFRESH_EXPIRE_DAYS = 7
+
+# How often each worker pulls new revocations (logout, disabled accounts) from Mongo
+REVOCATION_SYNC_SECONDS = 30
+# Each sync re-reads this far behind the last revoked_at it saw, to catch
+# revocations that landed late (writer clock skew, slow writes)
+REVOCATION_SYNC_OVERLAP_SECONDS = 300
+
+# Verified-token cache (entries never outlive the token's own expiry)
+TOKEN_CACHE_MAX_TTL_SECONDS = 300
+TOKEN_CACHE_MAX_ENTRIES = 10000
+
+# User profile cache used by get_user_from_token. Disabled accounts are caught
+# by the revocation list, so this only bounds staleness of profile fields
+USER_CACHE_TTL_SECONDS = 600
+USER_CACHE_MAX_ENTRIES = 10000
+
+# Paths that never need identity, the auth middleware skips them entirely
+PUBLIC_PATHS = (
+    "/",
+    "/health",
+    "/docs",
+    "/redoc",
+    "/openapi.json",
+    "/auth/login",
+    "/auth/register",
+    "/auth/refresh",
+)
+
+# Password hashing pool (bcrypt runs off the event loop)
+PASSWORD_HASH_WORKERS = 4
+PASSWORD_HASH_MAX_QUEUE = 64  # Hashes waiting beyond this are rejected with 503
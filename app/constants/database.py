@@ -1,7 +1,86 @@
+from datetime import datetime
+
 # MongoDB Collections
 COLLECTION_USERS = "users"
 COLLECTION_SESSIONS = "sessions"
 COLLECTION_MESSAGES = "messages"
 COLLECTION_IMAGES = "images"
 COLLECTION_MERMAID = "mermaid_diagrams"
-COLLECTION_DOCUMENTS = "documents"
\ No newline at end of file
+COLLECTION_DOCUMENTS = "documents"
+
+# Indexes created at startup: collection -> [(keys, options)]
+# Keys follow the equality -> sort -> range order of the queries they serve;
+# paginated listings end with _id, the keyset tie-breaker
+INDEXES = {
+    "messages": [
+        ([("session_id", 1), ("date", 1), ("_id", 1)], {}),
+    ],
+    "sessions": [
+        ([("user_id", 1), ("type", 1), ("date", 1), ("_id", 1)], {}),
+    ],
+    "chats": [
+        # Either branch of the conversation $or, sorted by time
+        ([("sender_id", 1), ("receiver_id", 1), ("created_at", 1), ("_id", 1)], {}),
+        ([("receiver_id", 1), ("created_at", -1)], {}),
+        ([("sender_id", 1), ("created_at", -1)], {}),
+    ],
+    "documents": [
+        ([("document_id", 1)], {"unique": True}),
+        ([("user_id", 1), ("status", 1)], {}),
+        ([("user_id", 1), ("_id", 1)], {}),  # Paginated listing
+        ([("status", 1), ("deleted_at", 1)], {}),  # Deletion sweeper
+    ],
+    "users": [
+        ([("email", 1)], {"unique": True}),
+    ],
+    "images": [
+        ([("session_id", 1), ("_id", 1)], {}),
+        # One image per job item, however many workers get to write it
+        ([("job_id", 1), ("item", 1)], {"unique": True, "partialFilterExpression": {"job_id": {"$exists": True}}}),
+    ],
+    "image_jobs": [
+        ([("status", 1), ("not_before", 1)], {}),  # Workers claiming due jobs
+        ([("status", 1), ("lease_until", 1)], {}),  # Expired leases
+        ([("expires_at", 1)], {"expireAfterSeconds": 0}),
+    ],
+    "mermaids": [
+        ([("session_id", 1)], {}),
+    ],
+    "refresh_sessions": [
+        ([("user_id", 1)], {}),
+        ([("expires_at", 1)], {"expireAfterSeconds": 0}),
+    ],
+    "revocations": [
+        ([("kind", 1), ("value", 1)], {"unique": True}),
+        ([("revoked_at", 1)], {}),
+        ([("expires_at", 1)], {"expireAfterSeconds": 0}),
+    ],
+}
+
+# Representative hot queries checked by `python -m app.core.indexes`:
+# (collection, filter, sort)
+HOT_QUERIES = [
+    ("messages", {"session_id": "x"}, [("date", 1), ("_id", 1)]),
+    ("sessions", {"user_id": "x", "type": "message"}, [("date", 1), ("_id", 1)]),
+    ("chats", {"$or": [{"sender_id": "x", "receiver_id": "y"}, {"sender_id": "y", "receiver_id": "x"}]}, [("created_at", 1), ("_id", 1)]),
+    ("chats", {"$or": [{"sender_id": "x"}, {"receiver_id": "x"}]}, [("created_at", -1)]),
+    ("documents", {"user_id": "x", "status": {"$ne": "deleting"}}, [("_id", 1)]),
+    ("documents", {"document_id": {"$in": ["x"]}, "user_id": "x"}, None),
+    ("documents", {"status": "deleting", "deleted_at": {"$lt": datetime.min}}, None),
+    ("users", {"email": "x"}, None),
+    ("images", {"session_id": "x"}, [("_id", 1)]),
+    ("image_jobs", {"status": "pending", "not_before": {"$lte": datetime.min}}, [("not_before", 1)]),
+    ("mermaids", {"session_id": "x"}, None),
+    ("revocations", {"revoked_at": {"$gt": datetime.min}, "expires_at": {"$gt": datetime.min}}, [("revoked_at", 1)]),
+]
+
+# Cursor pagination
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Message write-behind buffer (see MESSAGE_WRITE_MODE in .env.example)
+MESSAGE_WRITE_BUFFERED = "buffered"  # Batched insert_many, up to MESSAGE_FLUSH_SECONDS of writes at risk on a crash
+MESSAGE_WRITE_SYNC = "sync"  # One insert_many per turn, awaited before responding
+MESSAGE_FLUSH_SECONDS = 1.0
+MESSAGE_BATCH_SIZE = 500  # Flush early once this many messages are waiting
+MESSAGE_MAX_PENDING = 20000  # Oldest messages are dropped beyond this while Mongo is down
@@ -4,4 +4,7 @@ ALLOWED_FILE_EXTENSIONS = [".pdf"]
 
 # S3 Paths
 S3_IMAGES_PREFIX = "images/"
-S3_DOCUMENTS_PREFIX = "documents/"
\ No newline at end of file
+S3_DOCUMENTS_PREFIX = "documents/"
+
+# S3 multipart uploads (every part but the last must be at least 5 MiB)
+S3_MULTIPART_PART_SIZE = 5 * 1024 * 1024
@@ -31,4 +31,34 @@ VALID_IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg')
 MIN_IMAGE_OUTPUT_LENGTH = 10
 
 # Fallback providers (if primary fails validation)
-IMAGE_FALLBACK_PROVIDERS = ["pollinations", "huggingface"]
\ No newline at end of file
+IMAGE_FALLBACK_PROVIDERS = ["pollinations", "huggingface"]
+IMAGE_HEDGE_AFTER_SECONDS = 20  # Start the next provider in parallel after this long
+
+# Image generation jobs (see components/image/jobs.py)
+IMAGE_JOB_WORKERS = 4  # Concurrent generations per process
+IMAGE_JOB_POLL_SECONDS = 5  # Idle workers recheck for due jobs this often
+IMAGE_JOB_LEASE_SECONDS = 180  # A running job whose lease isn't renewed by then is retried
+IMAGE_JOB_HEARTBEAT_SECONDS = 60  # Running jobs renew their lease this often
+IMAGE_JOB_MAX_ATTEMPTS = 6
+IMAGE_JOB_RETENTION_DAYS = 7  # Finished jobs are removed by a TTL index
+IMAGE_LOADING_BACKOFF_SECONDS = 10  # Doubles per attempt while the model loads
+IMAGE_LOADING_MAX_BACKOFF_SECONDS = 120
+
+# Streaming provider images to S3
+MAX_GENERATED_IMAGE_BYTES = 10 * 1024 * 1024
+IMAGE_STREAM_CHUNK_SIZE = 64 * 1024
+IMAGE_SNIFF_BYTES = 12  # Enough for every signature below
+# (offset, signature, content type); WebP is RIFF....WEBP
+IMAGE_SIGNATURES = [
+    (0, b"\x89PNG\r\n\x1a\n", "image/png"),
+    (0, b"\xff\xd8\xff", "image/jpeg"),
+    (0, b"GIF87a", "image/gif"),
+    (0, b"GIF89a", "image/gif"),
+    (8, b"WEBP", "image/webp"),
+]
+
+# Batch generation (POST /image/batch)
+IMAGE_BATCH_MAX_PROMPTS = 8
+IMAGE_BATCH_MAX_VARIANTS = 4
+IMAGE_BATCH_MAX_ITEMS = 8  # prompts x variants
+IMAGE_BATCH_CONCURRENCY = 3  # Provider calls in flight per batch
@@ -11,4 +11,25 @@ DEFAULT_MODEL = "llama-3.3-70b-versatile"
 MERMAID_FALLBACK_CONFIGS = [
     {"provider": PROVIDER_GROQ, "model": "llama-3.3-70b-versatile"},
     {"provider": PROVIDER_GEMINI, "model": "gemini-2.5-flash"},
-]
\ No newline at end of file
+]
+# Conversation context window (chat history sent with each message)
+CONTEXT_WINDOW_MESSAGES = 20  # Latest N messages fetched from Mongo
+CONTEXT_CHARS_PER_TOKEN = 4  # Rough estimate, avoids a tokenizer dependency
+CONTEXT_RESPONSE_RESERVE_TOKENS = 1024  # Left free for the model's answer
+DEFAULT_CONTEXT_TOKENS = 8192
+# Prompt budget per model; kept well under the real context limit so
+# requests stay cheap and inside provider per-minute token caps
+MODEL_CONTEXT_TOKENS = {
+    "llama-3.3-70b-versatile": 8192,
+    "llama-3.1-70b-versatile": 8192,
+    "llama-3.1-8b-instant": 6144,
+    "gemini-2.5-flash": 16384,
+}
+
+# Rolling conversation summary (older turns folded into sessions.summary)
+SUMMARY_PROVIDER = PROVIDER_GROQ
+SUMMARY_MODEL = "llama-3.1-8b-instant"  # Cheap model, runs in the background
+SUMMARY_TRIGGER_TOKENS = 3000  # Unsummarized history size that triggers a pass
+SUMMARY_KEEP_RECENT_MESSAGES = 6  # Newest turns always sent verbatim
+SUMMARY_MAX_INPUT_TOKENS = 4000  # Transcript size per summarization pass
+SUMMARY_CONCURRENCY = 2  # Summaries in flight per worker
@@ -25,4 +25,22 @@ MERMAID_KEYWORDS = [
 ]
 
 # Minimum length for output validation
-MIN_MERMAID_OUTPUT_LENGTH = 15
\ No newline at end of file
+MIN_MERMAID_OUTPUT_LENGTH = 15
+
+# Start the next MERMAID_FALLBACK_CONFIGS entry in parallel after this long
+MERMAID_HEDGE_AFTER_SECONDS = 8
+
+# Local syntax checks (components/mermaid/parser.py)
+FLOWCHART_DIRECTIONS = ("TB", "TD", "BT", "RL", "LR")
+# Node shape openers -> closers, longest first so "((" wins over "("
+FLOWCHART_SHAPES = [
+    ("(((", ")))"), ("((", "))"), ("([", "])"), ("[[", "]]"), ("[(", ")]"),
+    ("{{", "}}"), ("[/", "/]"), ("[\\", "\\]"), ("[", "]"), ("(", ")"), ("{", "}"),
+]
+# Flowchart lines that are not node/edge statements
+FLOWCHART_DIRECTIVES = ("classDef", "class", "style", "linkStyle", "click", "direction")
+SEQUENCE_BLOCK_KEYWORDS = ("loop", "alt", "opt", "par", "critical", "break", "rect", "box")
+SEQUENCE_STATEMENT_KEYWORDS = (
+    "participant", "actor", "note", "activate", "deactivate", "autonumber",
+    "title", "else", "and", "option", "create", "destroy", "link", "links",
+)
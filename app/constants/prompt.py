@@ -52,4 +52,32 @@ science_topics = {
     "space": "Space",
     "quantum": "Quantum Physics",
     "genetics": "Genetics"
-}
\ No newline at end of file
+}
+
+# Greetings named "Greeting" by get_quick_name (whole message, or a short one containing a greeting word)
+greetings = ["hi", "hello", "hey", "hola", "greetings", "good morning", "good afternoon", "good evening"]
+greeting_words = ["hi", "hello", "hey", "hola"]
+
+# Keyword -> session name maps for get_quick_name, in priority order: when a
+# message matches several keywords, the earliest category (then keyword) wins
+quick_name_categories = [
+    programming,
+    cities,
+    dict.fromkeys(["weather", "temperature", "forecast", "rain", "snow", "sunny", "cloudy"], "Weather"),
+    dict.fromkeys(["recipe", "cook", "food", "meal", "dish", "restaurant", "cuisine"], "Food & Cooking"),
+    dict.fromkeys(["joke", "funny", "laugh", "story", "game", "play"], "Entertainment"),
+    dict.fromkeys(["calculate", "math", "equation", "solve", "algebra", "geometry"], "Math Help"),
+    dict.fromkeys(["health", "fitness", "exercise", "workout", "diet", "nutrition"], "Health & Fitness"),
+    dict.fromkeys(["travel", "trip", "vacation", "flight", "hotel", "tourist"], "Travel"),
+    dict.fromkeys(["buy", "purchase", "shop", "product", "price", "discount"], "Shopping"),
+    dict.fromkeys(["news", "current", "event", "happening", "today"], "News"),
+    dict.fromkeys(["computer", "laptop", "phone", "device", "tech", "software"], "Technology"),
+    science_topics,
+    dict.fromkeys(["ai", "artificial intelligence", "machine learning", "ml", "deep learning", "neural network"], "AI & ML"),
+    dict.fromkeys(["business", "finance", "money", "investment", "stock", "market"], "Business & Finance"),
+    dict.fromkeys(["learn", "study", "education", "course", "teach", "tutorial"], "Learning"),
+    dict.fromkeys(["book", "read", "novel", "author", "literature"], "Books"),
+    dict.fromkeys(["movie", "film", "tv", "show", "series", "watch"], "Movies & TV"),
+    dict.fromkeys(["music", "song", "album", "artist", "band", "listen"], "Music"),
+    dict.fromkeys(["sport", "football", "soccer", "basketball", "cricket", "tennis"], "Sports"),
+]
@@ -7,4 +7,36 @@ TOP_K_RESULTS = 5
 
 # Embedding model (HuggingFace)
 EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
-EMBEDDING_DIMENSION = 384  # Dimension for all-MiniLM-L6-v2
\ No newline at end of file
+EMBEDDING_DIMENSION = 384  # Dimension for all-MiniLM-L6-v2
+
+# Document status values
+DOCUMENT_STATUS_PROCESSING = "processing"
+DOCUMENT_STATUS_INDEXED = "indexed"
+DOCUMENT_STATUS_ERROR = "error"
+DOCUMENT_STATUS_DELETING = "deleting"  # Tombstone while vectors/S3 are being removed
+
+# Deletion settings
+BULK_DELETE_MAX_DOCUMENTS = 100
+DELETE_CONCURRENCY = 10  # Documents purged in parallel during a bulk delete
+DELETE_RETRY_ATTEMPTS = 3
+DELETE_SWEEP_INTERVAL_SECONDS = 300
+DELETE_SWEEP_GRACE_SECONDS = 600  # Only sweep tombstones older than this
+DELETE_SWEEP_BATCH_SIZE = 100
+
+# Per-user cache of document IDs known to be indexed (skips status checks on query)
+INDEXED_DOCUMENTS_CACHE_TTL_SECONDS = 30
+INDEXED_DOCUMENTS_CACHE_MAX_USERS = 10000
+
+# Document status push notifications
+STATUS_NOTIFY_COALESCE_SECONDS = 0.5  # Batch status changes per user within this window
+STATUS_POLL_INTERVAL_SECONDS = 3  # Fallback when Mongo change streams are unavailable
+STATUS_WATCH_RETRY_SECONDS = 5
+
+# Agentic RAG budgets (per request)
+AGENT_MAX_STEPS = 3  # Plan -> retrieve -> answer -> verify rounds
+AGENT_TIME_BUDGET_SECONDS = 30
+AGENT_MAX_SUB_QUERIES = 5
+
+# RAG answer cache (keyed by normalized query, top_k and document-set version)
+QUERY_CACHE_TTL_SECONDS = 600
+QUERY_CACHE_MAX_ENTRIES = 5000
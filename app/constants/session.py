@@ -8,4 +8,7 @@ SESSION_TYPE_RAG = "rag"
 STATUS_SUCCESS = "success"
 STATUS_LOADING = "loading"
 STATUS_ERROR = "error"
-STATUS_PENDING = "pending"
\ No newline at end of file
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+# Shown until the LLM-generated name arrives over the WebSocket
+PROVISIONAL_SESSION_NAME = "New Chat"
@@ -65,4 +65,10 @@ MAX_COMBINING_CHAR_RATIO = 0.3  # 30% of total characters
 QUESTION_STARTERS = ["what", "how", "why", "when", "where", "who", "explain", "tell me"]
 
 # Output validation retry settings
-MAX_RETRY_ATTEMPTS = 2  # How many times to retry if output validation fails
\ No newline at end of file
+MAX_RETRY_ATTEMPTS = 2  # How many times to retry if output validation fails
+
+# Moderation pipeline (classifier tier is enabled with MODERATION_CLASSIFIER_MODEL)
+MODERATION_CACHE_TTL_SECONDS = 3600
+MODERATION_CACHE_MAX_ENTRIES = 20000
+MODERATION_CLASSIFIER_TIMEOUT_SECONDS = 5  # Extra wait allowed after the LLM answer is ready
+MODERATION_FAIL_OPEN = True  # Release the answer when the classifier errors or times out
@@ -0,0 +1,84 @@
+import asyncio
+import logging
+from typing import Dict, List
+from pymongo import IndexModel
+from pymongo.errors import ConnectionFailure, PyMongoError
+from app.constants.database import INDEXES, HOT_QUERIES
+
+logger = logging.getLogger(__name__)
+
+
+async def ensure_indexes(db) -> Dict[str, List[str]]:
+    """
+    Create the indexes declared in INDEXES. create_indexes is a no-op for
+    indexes that already exist, so this is safe on every startup. A failure
+    on one collection (e.g. duplicate emails blocking a unique index) is
+    logged and doesn't stop the others or the app.
+    """
+    created = {}
+
+    for collection, specs in INDEXES.items():
+        models = [IndexModel(keys, **options) for keys, options in specs]
+        try:
+            created[collection] = await db[collection].create_indexes(models)
+        except ConnectionFailure as e:
+            logger.error(f"Skipping index creation, MongoDB unreachable: {str(e)}")
+            break
+        except PyMongoError as e:
+            logger.error(f"Failed to create indexes on {collection}: {str(e)}")
+
+    return created
+
+
+def _plan_stages(plan: Dict) -> List[str]:
+    stages = [plan.get("stage")]
+    for child in plan.get("inputStages", []) + [plan.get("inputStage")]:
+        if child:
+            stages.extend(_plan_stages(child))
+    return stages
+
+
+async def explain_hot_queries(db) -> List[Dict]:
+    """Run explain() on each hot query and report whether it scans the collection."""
+    report = []
+
+    for collection, query_filter, sort in HOT_QUERIES:
+        command = {"find": collection, "filter": query_filter}
+        if sort:
+            command["sort"] = dict(sort)
+
+        explain = await db.command({"explain": command, "verbosity": "queryPlanner"})
+        winning_plan = explain["queryPlanner"]["winningPlan"]
+        # Slot-based engine (MongoDB 7+) nests the classic plan
+        stages = _plan_stages(winning_plan.get("queryPlan", winning_plan))
+
+        report.append({
+            "collection": collection,
+            "filter": query_filter,
+            "sort": sort,
+            "stages": stages,
+            "collection_scan": "COLLSCAN" in stages,
+            "in_memory_sort": "SORT" in stages
+        })
+
+    return report
+
+
+async def main():
+    from app.core.database import db
+
+    await ensure_indexes(db)
+    report = await explain_hot_queries(db)
+
+    for entry in report:
+        flag = "COLLSCAN" if entry["collection_scan"] else "ok"
+        if entry["in_memory_sort"]:
+            flag += " (in-memory sort)"
+        print(f"[{flag}] {entry['collection']} {entry['filter']} sort={entry['sort']} -> {' > '.join(entry['stages'])}")
+
+    if any(entry["collection_scan"] for entry in report):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,21 +1,55 @@
 import os
+import time
+import uuid
+import hashlib
 from datetime import datetime, timedelta
 from typing import Optional, Dict
 from jose import JWTError, jwt
-from fastapi import HTTPException, status, Request
+from fastapi import HTTPException, WebSocketException, status
+from starlette.requests import HTTPConnection
 from dotenv import load_dotenv
 from app.core.database import db
 from bson import ObjectId
 from app.helpers.serializer import serialize_doc
+from app.helpers.cache import TTLCache
+from app.helpers.revocation import revocation_list, REVOKE_SESSION, REVOKE_USER
+from app.constants.auth import (
+    TOKEN_CACHE_MAX_TTL_SECONDS,
+    TOKEN_CACHE_MAX_ENTRIES,
+    USER_CACHE_TTL_SECONDS,
+    USER_CACHE_MAX_ENTRIES,
+)
 
 load_dotenv()
 
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-this-in-production")
 ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("JWT_EXPIRE_MINUTES", "1440"))  # 24 hours
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("JWT_EXPIRE_MINUTES", "15"))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("JWT_REFRESH_EXPIRE_DAYS", "7"))
 
+ACCESS_TOKEN_TYPE = "access"
+REFRESH_TOKEN_TYPE = "refresh"
 
-def generate_token(user_id: str, email: str, expires_delta: Optional[timedelta] = None) -> str:
+# sha256(token) -> decoded payload
+_verified_tokens = TTLCache(ttl_seconds=TOKEN_CACHE_MAX_TTL_SECONDS, max_size=TOKEN_CACHE_MAX_ENTRIES)
+# user_id -> serialized user without password
+_user_profiles = TTLCache(ttl_seconds=USER_CACHE_TTL_SECONDS, max_size=USER_CACHE_MAX_ENTRIES)
+
+
+def _credentials_error(detail: str = "Could not validate credentials") -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def generate_token(
+    user_id: str,
+    email: str,
+    expires_delta: Optional[timedelta] = None,
+    session_id: Optional[str] = None
+) -> str:
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
@@ -24,6 +58,9 @@ def generate_token(user_id: str, email: str, expires_delta: Optional[timedelta]
     payload = {
         "user_id": user_id,
         "email": email,
+        "type": ACCESS_TOKEN_TYPE,
+        "sid": session_id,
+        "jti": uuid.uuid4().hex,
         "exp": expire,
         "iat": datetime.utcnow()
     }
@@ -32,16 +69,51 @@ def generate_token(user_id: str, email: str, expires_delta: Optional[timedelta]
     return encoded_jwt
 
 
-def verify_token(token: str) -> Dict:
+def generate_refresh_token(user_id: str, email: str, session_id: str, jti: str) -> str:
+    payload = {
+        "user_id": user_id,
+        "email": email,
+        "type": REFRESH_TOKEN_TYPE,
+        "sid": session_id,
+        "jti": jti,
+        "exp": datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+        "iat": datetime.utcnow()
+    }
+
+    return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def _decode_token(token: str) -> Dict:
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
-    except JWTError as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        raise _credentials_error()
+
+
+def verify_token(token: str) -> Dict:
+    token_hash = hashlib.sha256(token.encode()).hexdigest()
+
+    payload = _verified_tokens.get(token_hash)
+    if payload is None:
+        payload = _decode_token(token)
+
+        # Tokens issued before refresh tokens existed carry no type
+        if payload.get("type", ACCESS_TOKEN_TYPE) != ACCESS_TOKEN_TYPE:
+            raise _credentials_error()
+
+        # Never cache a token past its own expiry
+        ttl = min(payload.get("exp", 0) - time.time(), TOKEN_CACHE_MAX_TTL_SECONDS)
+        _verified_tokens.set(token_hash, payload, ttl)
+
+    # Checked on every call, revocations must win over the cache
+    if revocation_list.is_revoked(payload):
+        raise _credentials_error("Token has been revoked")
+
+    return payload
+
+
+def invalidate_user_cache(user_id: str):
+    _user_profiles.delete(user_id)
 
 
 async def get_user_from_token(token: str) -> Dict:
@@ -55,8 +127,12 @@ async def get_user_from_token(token: str) -> Dict:
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    cached_user = _user_profiles.get(user_id)
+    if cached_user is not None:
+        return dict(cached_user)
+
     try:
-        user = await db.users.find_one({"_id": ObjectId(user_id)})
+        user = await db.users.find_one({"_id": ObjectId(user_id)}, {"password": 0})
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -64,10 +140,10 @@ async def get_user_from_token(token: str) -> Dict:
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        if "password" in user:
-            del user["password"]
+        user = serialize_doc(user)
+        _user_profiles.set(user_id, user)
 
-        return serialize_doc(user)
+        return dict(user)
 
     except Exception as e:
         if isinstance(e, HTTPException):
@@ -77,10 +153,117 @@ async def get_user_from_token(token: str) -> Dict:
             detail="Error fetching user data"
         )
 
-def create_token_response(user_data: Dict) -> str:
-    token = generate_token(user_data["id"], user_data["email"])
-    return token
+async def create_session_tokens(user_data: Dict) -> Dict:
+    """Start a refresh session and issue its first access/refresh token pair."""
+    session_id = uuid.uuid4().hex
+    refresh_jti = uuid.uuid4().hex
+    now = datetime.utcnow()
+
+    await db.refresh_sessions.insert_one({
+        "_id": session_id,
+        "user_id": user_data["id"],
+        "refresh_jti": refresh_jti,
+        "created_at": now,
+        "expires_at": now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    })
+
+    return {
+        "access_token": generate_token(user_data["id"], user_data["email"], session_id=session_id),
+        "refresh_token": generate_refresh_token(user_data["id"], user_data["email"], session_id, refresh_jti)
+    }
+
+
+async def rotate_refresh_token(refresh_token: str) -> Dict:
+    """
+    Exchange a refresh token for a new token pair. Each refresh token is
+    single use: presenting an already rotated one means it leaked, so the
+    whole session is revoked.
+    """
+    payload = _decode_token(refresh_token)
+    session_id = payload.get("sid")
+    user_id = payload.get("user_id")
+
+    if payload.get("type") != REFRESH_TOKEN_TYPE or not session_id or not user_id:
+        raise _credentials_error()
+
+    if revocation_list.is_revoked(payload):
+        raise _credentials_error("Token has been revoked")
+
+    new_jti = uuid.uuid4().hex
+    session = await db.refresh_sessions.find_one_and_update(
+        {"_id": session_id, "refresh_jti": payload.get("jti"), "revoked": {"$ne": True}},
+        {"$set": {"refresh_jti": new_jti, "last_used_at": datetime.utcnow()}}
+    )
+
+    if not session:
+        await revoke_session(session_id)
+        raise _credentials_error("Refresh token has already been used")
+
+    user = await db.users.find_one({"_id": ObjectId(user_id)}, {"email": 1, "status": 1})
+    if not user or user.get("status", "active") != "active":
+        await revoke_session(session_id)
+        raise _credentials_error("User Is UnAuthorized.")
+
+    return {
+        "access_token": generate_token(user_id, user["email"], session_id=session_id),
+        "refresh_token": generate_refresh_token(user_id, user["email"], session_id, new_jti)
+    }
+
+
+async def revoke_session(session_id: str):
+    """Log a session out everywhere: its refresh token and any live access tokens."""
+    await db.refresh_sessions.update_one({"_id": session_id}, {"$set": {"revoked": True}})
+    await revocation_list.revoke(
+        REVOKE_SESSION,
+        session_id,
+        datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    )
+
+
+async def revoke_user_tokens(user_id: str, active: bool = True):
+    """Revoke (or, with active=False, lift the revocation of) every token a user holds."""
+    invalidate_user_cache(user_id)
+    await revocation_list.revoke(
+        REVOKE_USER,
+        user_id,
+        datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+        active=active
+    )
+
+
+def get_session_id(token: Optional[str]) -> Optional[str]:
+    """Session id of an access or refresh token, ignoring expiry (used on logout)."""
+    if not token:
+        return None
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], options={"verify_exp": False})
+    except JWTError:
+        return None
+    return payload.get("sid")
+
+async def resolve_user(connection: HTTPConnection) -> Optional[Dict]:
+    """Resolve (once per request) the user for the token found by AuthMiddleware."""
+    state = connection.state
+    if getattr(state, "is_authenticated", False):
+        return state.user
+
+    token = getattr(state, "auth_token", None)
+    if not token:
+        return None
+
+    try:
+        user = await get_user_from_token(token)
+    except Exception:
+        state.auth_token = None
+        return None
+
+    state.is_authenticated = True
+    state.user = user
+    return user
+
 
-def check_for_auth(request: Request):
-    if not getattr(request.state, "is_authenticated", False):
+async def check_for_auth(connection: HTTPConnection):
+    if await resolve_user(connection) is None:
+        if connection.scope["type"] == "websocket":
+            raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="User Is UnAuthorized.")
         raise HTTPException(status_code=401, detail="User Is UnAuthorized.")
\ No newline at end of file
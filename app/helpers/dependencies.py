@@ -1,6 +1,7 @@
 from app.core.database import db
 from app.components.session.service import SessionService
 from app.components.llm.service import LlmService
+from app.components.moderation.service import ModerationService
 from app.components.message.service import MessageService
 from app.components.user.service import UserService
 from app.components.auth.service import AuthService
@@ -17,11 +18,12 @@ class ServiceContainer:
         self.user = UserService(db)
         self.auth = AuthService(db)
         self.chat = ChatService(db)
+        self.moderation = ModerationService(self.llm)
 
-        self.message = MessageService(db, self.session, self.llm)
+        self.message = MessageService(db, self.session, self.llm, self.moderation)
         self.rag = RagService(db, self.llm)
-        self.image = ImageService(db, self.llm, self.session)
-        self.mermaid = MermaidService(db, self.llm, self.session)
+        self.image = ImageService(db, self.llm, self.session, self.moderation)
+        self.mermaid = MermaidService(db, self.llm, self.session, self.moderation)
         self.project_generator = ProjectGeneratorService(db, self.llm)
         
 
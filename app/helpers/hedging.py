@@ -0,0 +1,70 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+async def hedged(
+    attempts: Sequence[Callable[[], Awaitable[Any]]],
+    is_valid: Callable[[Any], bool],
+    hedge_after: float
+) -> Tuple[int, Any]:
+    """
+    Run `attempts` (primary first) as a failover chain with hedging: the
+    next attempt starts as soon as the running ones have all failed, or in
+    parallel once `hedge_after` seconds pass without a valid result.
+    Returns (index, result) of the first result passing `is_valid` and
+    cancels the rest.
+
+    If nothing is valid, returns the last invalid result so the caller's
+    own output checks report it, or re-raises the last exception.
+    """
+    running = {}
+    next_index = 0
+    last_result, last_error = None, None
+
+    def launch():
+        nonlocal next_index
+        task = asyncio.ensure_future(attempts[next_index]())
+        running[task] = next_index
+        next_index += 1
+
+    launch()
+    try:
+        while running:
+            can_hedge = next_index < len(attempts)
+            done, _ = await asyncio.wait(
+                running,
+                timeout=hedge_after if can_hedge else None,
+                return_when=asyncio.FIRST_COMPLETED
+            )
+
+            if not done:
+                logger.info(f"No valid result after {hedge_after}s, hedging with attempt {next_index + 1}/{len(attempts)}")
+                launch()
+                continue
+
+            for task in done:
+                index = running.pop(task)
+                try:
+                    result = task.result()
+                except Exception as e:
+                    logger.warning(f"Attempt {index + 1}/{len(attempts)} failed: {str(e)}")
+                    last_error = e
+                    continue
+
+                if is_valid(result):
+                    return index, result
+                logger.warning(f"Attempt {index + 1}/{len(attempts)} returned an invalid result")
+                last_result = (index, result)
+
+            if not running and next_index < len(attempts):
+                launch()
+    finally:
+        for task in running:
+            task.cancel()
+
+    if last_result is not None:
+        return last_result
+    raise last_error
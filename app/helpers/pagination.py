@@ -0,0 +1,67 @@
+import base64
+from typing import Dict, Generic, List, Optional, Tuple, TypeVar
+from bson import json_util
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+T = TypeVar('T')
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+
+def encode_cursor(values: list) -> str:
+    # json_util keeps ObjectId/datetime round-trippable
+    return base64.urlsafe_b64encode(json_util.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    try:
+        values = json_util.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+    return values
+
+
+def _after(sort: List[Tuple[str, int]], values: list) -> Dict:
+    """Keyset filter for rows strictly after `values` in `sort` order."""
+    branches = []
+    for i, (field, direction) in enumerate(sort):
+        branch = {prev_field: values[j] for j, (prev_field, _) in enumerate(sort[:i])}
+        branch[field] = {"$gt" if direction == 1 else "$lt": values[i]}
+        branches.append(branch)
+
+    return {"$or": branches}
+
+
+async def paginate(
+    collection,
+    query: Dict,
+    sort: List[Tuple[str, int]],
+    limit: int,
+    cursor: Optional[str] = None,
+    projection: Optional[Dict] = None
+) -> Tuple[List[Dict], Optional[str]]:
+    """
+    Keyset pagination. `sort` must end with `_id` so the order is total and
+    pages never skip or repeat rows, whatever is inserted in between.
+    Returns the raw documents and the cursor for the next page (None on the last).
+    """
+    if cursor:
+        query = {"$and": [query, _after(sort, decode_cursor(cursor, len(sort)))]}
+
+    # One extra row tells us whether another page exists
+    documents = await collection.find(query, projection).sort(sort).limit(limit + 1).to_list(length=limit + 1)
+
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        next_cursor = encode_cursor([documents[-1].get(field) for field, _ in sort])
+
+    return documents, next_cursor
@@ -0,0 +1,67 @@
+import os
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+from fastapi import HTTPException
+from passlib.context import CryptContext
+from dotenv import load_dotenv
+from app.constants.auth import PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# min/max pinned to the configured cost so verify_and_update flags any
+# hash made with a different cost for transparent rehash on login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+# bcrypt releases the GIL, so a small thread pool gives real parallelism
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+
+_stats = {"pending": 0, "completed": 0, "rejected": 0}
+
+
+def get_password_pool_stats() -> dict:
+    return {
+        "workers": PASSWORD_HASH_WORKERS,
+        "pending": _stats["pending"],
+        "queue_depth": max(0, _stats["pending"] - PASSWORD_HASH_WORKERS),
+        "completed": _stats["completed"],
+        "rejected": _stats["rejected"],
+    }
+
+
+async def _run_in_pool(func, *args):
+    if _stats["pending"] >= PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_QUEUE:
+        _stats["rejected"] += 1
+        logger.warning(f"Password hash pool saturated: {get_password_pool_stats()}")
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy, please try again.",
+            headers={"Retry-After": "1"}
+        )
+
+    _stats["pending"] += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, func, *args)
+    finally:
+        _stats["pending"] -= 1
+        _stats["completed"] += 1
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_in_pool(pwd_context.hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Returns (is_valid, new_hash). new_hash is set when the stored hash should be upgraded."""
+    return await _run_in_pool(pwd_context.verify_and_update, plain_password, hashed_password)
@@ -0,0 +1,119 @@
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, List
+from app.constants.validation import (
+    VIOLENCE_KEYWORDS,
+    ADULT_KEYWORDS,
+    ILLEGAL_KEYWORDS,
+    HATE_KEYWORDS,
+    INVISIBLE_CHARS,
+    DIRECTIONAL_OVERRIDES,
+    MAX_INVISIBLE_CHARS,
+    MAX_CONTROL_CHARS,
+    MAX_NEWLINES,
+    MAX_WORD_REPETITION,
+    MAX_COMBINING_CHAR_RATIO,
+)
+
+# Everything below is built once at import. Keyword matching uses C-level
+# substring search over one flat tuple: for the ~40 keywords and <=500 char
+# prompts here it benchmarks faster than a combined regex (and than a
+# pure-Python Aho-Corasick automaton), while keeping substring semantics.
+
+_HARMFUL_CATEGORIES = [
+    (VIOLENCE_KEYWORDS, "Content related to violence, weapons, or self-harm is not allowed."),
+    (ADULT_KEYWORDS, "Adult or explicit content is not allowed."),
+    (ILLEGAL_KEYWORDS, "Content promoting illegal activities is not allowed."),
+    (HATE_KEYWORDS, "Hate speech or discriminatory content is not allowed."),
+]
+
+# (keyword, category priority), deduplicated, in priority order
+_HARMFUL_KEYWORDS = tuple({
+    keyword: priority
+    for priority, (keywords, _) in reversed(list(enumerate(_HARMFUL_CATEGORIES)))
+    for keyword in keywords
+}.items())
+
+# Kept separate: a combined alternation defeats re's literal-prefix
+# optimisations and benchmarks several times slower
+_ENCODED_PATTERNS = [
+    (re.compile(r"[A-Za-z0-9+/=]{100,}"), "Suspicious encoded content detected."),
+    (re.compile(r"(?:0x)?[0-9a-fA-F]{100,}"), "Suspicious hex-encoded content detected."),
+    (re.compile(r"(.)\1{20,}"), "Excessive character repetition detected."),
+]
+
+_ASCII_CONTROL_PATTERN = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]")
+_INVISIBLE = frozenset(INVISIBLE_CHARS)
+_DIRECTIONAL = frozenset(DIRECTIONAL_OVERRIDES)
+_ALLOWED_CONTROL = frozenset("\n\r\t")
+_COMBINING_CATEGORIES = frozenset(("Mn", "Mc", "Me"))
+
+
+def _count_characters(prompt: str) -> Dict[str, int]:
+    if prompt.isascii():
+        # Common case: none of the Unicode tricks are possible
+        return {
+            "invisible": 0,
+            "directional": 0,
+            "control": len(_ASCII_CONTROL_PATTERN.findall(prompt)),
+            "combining": 0,
+        }
+
+    counts = {"invisible": 0, "directional": 0, "control": 0, "combining": 0}
+    for char in prompt:
+        if char.isascii() and char.isprintable():
+            continue
+        if char in _INVISIBLE:
+            counts["invisible"] += 1
+        if char in _DIRECTIONAL:
+            counts["directional"] += 1
+
+        category = unicodedata.category(char)
+        if category == "Cc" and char not in _ALLOWED_CONTROL:
+            counts["control"] += 1
+        elif category in _COMBINING_CATEGORIES:
+            counts["combining"] += 1
+
+    return counts
+
+
+def scan_prompt(prompt: str) -> Dict[str, List[str]]:
+    """
+    Run every malicious-input and harmful-content check on a prompt in one
+    go. Returns {"malicious": [...], "harmful": [...]}, each list holding
+    the rejection reasons found, most important first.
+    """
+    malicious = []
+    counts = _count_characters(prompt)
+
+    if counts["invisible"] > MAX_INVISIBLE_CHARS:
+        malicious.append("Suspicious invisible characters detected in prompt.")
+    if counts["directional"]:
+        malicious.append("Directional override characters are not allowed.")
+    if counts["control"] > MAX_CONTROL_CHARS:
+        malicious.append("Excessive control characters detected.")
+
+    malicious.extend(reason for pattern, reason in _ENCODED_PATTERNS if pattern.search(prompt))
+
+    words = prompt.lower().split()
+    # Too few duplicates overall means no single word can repeat too often
+    if (
+        len(words) > 10
+        and len(words) - len(set(words)) >= MAX_WORD_REPETITION
+        and Counter(words).most_common(1)[0][1] > MAX_WORD_REPETITION
+    ):
+        malicious.append("Excessive word repetition detected.")
+
+    if "\x00" in prompt:
+        malicious.append("Null bytes are not allowed.")
+    if prompt.count("\n") > MAX_NEWLINES:
+        malicious.append("Excessive line breaks detected.")
+    if counts["combining"] > len(prompt) * MAX_COMBINING_CHAR_RATIO:
+        malicious.append("Excessive combining characters detected.")
+
+    prompt_lower = prompt.lower()
+    found = {priority for keyword, priority in _HARMFUL_KEYWORDS if keyword in prompt_lower}
+    harmful = [reason for priority, (_, reason) in enumerate(_HARMFUL_CATEGORIES) if priority in found]
+
+    return {"malicious": malicious, "harmful": harmful}
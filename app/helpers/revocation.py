@@ -0,0 +1,105 @@
+import time
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict
+from app.core.database import db
+from app.constants.auth import REVOCATION_SYNC_SECONDS, REVOCATION_SYNC_OVERLAP_SECONDS
+
+logger = logging.getLogger(__name__)
+
+REVOKE_SESSION = "session"
+REVOKE_USER = "user"
+
+
+def _epoch(value: datetime) -> float:
+    # Mongo returns naive UTC datetimes
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+class RevocationList:
+    """
+    In-memory copy of the `revocations` collection so token verification
+    never touches the database. Local revocations apply immediately, other
+    workers pick them up within REVOCATION_SYNC_SECONDS.
+
+    - session revocations (logout, refresh-token reuse) kill every token
+      carrying that `sid`
+    - user revocations (account disabled) kill every token issued before
+      the revocation time
+    """
+
+    def __init__(self):
+        self._sessions: Dict[str, float] = {}  # sid -> expires_at (epoch)
+        self._users: Dict[str, tuple] = {}  # user_id -> (revoked_at, expires_at)
+        self._synced_until = datetime.min
+
+    def is_revoked(self, payload: Dict) -> bool:
+        sid = payload.get("sid")
+        if sid and sid in self._sessions:
+            return True
+
+        user_revocation = self._users.get(payload.get("user_id"))
+        return bool(user_revocation) and payload.get("iat", 0) <= user_revocation[0]
+
+    def _apply(self, entry: Dict):
+        expires_at = _epoch(entry["expires_at"])
+        if entry["kind"] == REVOKE_SESSION:
+            self._sessions[entry["value"]] = expires_at
+        elif entry.get("active", True):
+            self._users[entry["value"]] = (_epoch(entry["revoked_at"]), expires_at)
+        else:
+            self._users.pop(entry["value"], None)
+
+    def _prune(self):
+        now = time.time()
+        self._sessions = {sid: exp for sid, exp in self._sessions.items() if exp > now}
+        self._users = {uid: value for uid, value in self._users.items() if value[1] > now}
+
+    async def revoke(self, kind: str, value: str, expires_at: datetime, active: bool = True):
+        entry = {
+            "kind": kind,
+            "value": value,
+            "active": active,
+            "revoked_at": datetime.utcnow(),
+            "expires_at": expires_at
+        }
+        self._apply(entry)
+        await db.revocations.update_one(
+            {"kind": kind, "value": value},
+            {"$set": entry},
+            upsert=True
+        )
+
+    async def sync(self):
+        # revoked_at comes from the writer's clock, so an entry can commit after
+        # we've read past it; re-reading an overlap is safe since _apply is idempotent
+        since = self._synced_until
+        overlap = timedelta(seconds=REVOCATION_SYNC_OVERLAP_SECONDS)
+        if since > datetime.min + overlap:
+            since -= overlap
+
+        cursor = db.revocations.find(
+            {"revoked_at": {"$gt": since}, "expires_at": {"$gt": datetime.utcnow()}},
+            {"_id": 0}
+        ).sort("revoked_at", 1)
+
+        async for entry in cursor:
+            self._apply(entry)
+            self._synced_until = max(self._synced_until, entry["revoked_at"])
+
+        self._prune()
+
+    async def run(self):
+        while True:
+            try:
+                await self.sync()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Revocation list sync failed: {str(e)}", exc_info=True)
+
+            await asyncio.sleep(REVOCATION_SYNC_SECONDS)
+
+
+revocation_list = RevocationList()
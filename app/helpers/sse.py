@@ -0,0 +1,7 @@
+import json
+from typing import Any
+from fastapi.encoders import jsonable_encoder
+
+
+def format_sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
@@ -1,4 +1,5 @@
 import os
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
@@ -20,7 +21,29 @@ load_dotenv()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    from app.core.database import db
+    from app.core.socket_manager import manager
+    from app.components.rag.cleanup import run_deletion_sweeper
+    from app.components.rag.status_notifier import DocumentStatusNotifier
+    from app.helpers.revocation import revocation_list
+    from app.core.indexes import ensure_indexes
+    from app.helpers.dependencies import get_message_service, get_image_service
+    message_buffer = get_message_service().buffer
+    await ensure_indexes(db)
+    revocation_sync = asyncio.create_task(revocation_list.run())
+    message_flusher = asyncio.create_task(message_buffer.run())
+    deletion_sweeper = asyncio.create_task(run_deletion_sweeper(db))
+    status_notifier = asyncio.create_task(DocumentStatusNotifier(db, manager).run())
+    image_workers = asyncio.create_task(get_image_service().jobs.run())
+
     yield
+
+    revocation_sync.cancel()
+    message_flusher.cancel()
+    await message_buffer.close()
+    deletion_sweeper.cancel()
+    status_notifier.cancel()
+    image_workers.cancel()
     from app.helpers.dependencies import get_llm_service
     await get_llm_service().close()
 
@@ -83,9 +106,11 @@ def root():
 
 @app.get("/health")
 def health():
+    from app.helpers.password import get_password_pool_stats
     return {
         "status": "ok",
-        "message": "Service is healthy"
+        "message": "Service is healthy",
+        "password_hashing": get_password_pool_stats()
     }
 
 app.include_router(UserRouter)
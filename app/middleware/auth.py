@@ -1,30 +1,44 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from fastapi import Request, HTTPException
-from app.helpers.auth import get_user_from_token
-
-class AuthMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        token = None
-
-        authorization = request.headers.get("Authorization")
-        if authorization:
-            token = authorization.split()[-1]
-
-        if not token:
-            token = request.cookies.get("access_token")
-
-        if token:
-            try:
-                user = await get_user_from_token(token)
-                request.state.is_authenticated = True
-                request.state.user = user
-            except:
-                request.state.is_authenticated = False
-                request.state.user = None
-        else:
-            request.state.is_authenticated = False
-            request.state.user = None
-
-        response = await call_next(request)
-
-        return response
\ No newline at end of file
+from typing import Optional
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.constants.auth import PUBLIC_PATHS
+
+
+def get_token(connection: HTTPConnection) -> Optional[str]:
+    authorization = connection.headers.get("Authorization")
+    if authorization:
+        return authorization.split()[-1]
+
+    token = connection.cookies.get("access_token")
+
+    # Browsers can't set headers on WebSocket handshakes
+    if not token and connection.scope["type"] == "websocket":
+        token = connection.query_params.get("token")
+
+    return token
+
+
+class AuthMiddleware:
+    """
+    Raw ASGI middleware that only extracts the bearer token. The user is
+    resolved lazily by `check_for_auth`, so routes that don't declare it
+    never pay for token verification or the user lookup.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        state = scope.setdefault("state", {})
+        state["is_authenticated"] = False
+        state["user"] = None
+        state["auth_token"] = None
+
+        if scope["path"] not in PUBLIC_PATHS:
+            state["auth_token"] = get_token(HTTPConnection(scope))
+
+        await self.app(scope, receive, send)
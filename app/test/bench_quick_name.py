@@ -0,0 +1,51 @@
+"""
+Micro-benchmark for get_quick_name against the previous substring-scan
+implementation. Run from the repo root:
+
+    python -m app.test.bench_quick_name
+"""
+import timeit
+from app.utils.prompt import get_quick_name
+from app.constants.prompt import greetings, greeting_words, quick_name_categories
+
+MESSAGES = [
+    "hi",
+    "Can you help me debug this React component that re-renders forever?",
+    "What's the weather like in Tokyo next week?",
+    "Give me a quick recipe for dinner with chicken and rice",
+    "Explain how neural networks learn, step by step",
+    "I said I would finish the report, what should I put in the summary?",
+    "Tell me something interesting",
+    "Plan a three day trip itinerary for a family with kids",
+]
+
+
+def legacy_quick_name(message: str):
+    """Substring scan as get_quick_name worked before the compiled matcher."""
+    message_lower = message.lower().strip()
+
+    if message_lower in greetings or len(message_lower.split()) <= 2:
+        if any(word in message_lower for word in greeting_words):
+            return "Greeting"
+
+    for category in quick_name_categories:
+        for keyword, name in category.items():
+            if keyword in message_lower:
+                return name
+
+    return None
+
+
+def main(number: int = 20000):
+    for name, func in (("legacy", legacy_quick_name), ("compiled", get_quick_name)):
+        seconds = timeit.timeit(lambda: [func(message) for message in MESSAGES], number=number)
+        per_call = seconds / (number * len(MESSAGES)) * 1e6
+        print(f"{name:>8}: {per_call:.2f} us/message")
+
+    print()
+    for message in MESSAGES:
+        print(f"{legacy_quick_name(message)!s:>16} | {get_quick_name(message)!s:<16} | {message}")
+
+
+if __name__ == "__main__":
+    main()
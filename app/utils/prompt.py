@@ -1,100 +1,56 @@
-from app.constants.prompt import cities, programming, science_topics
+import re
+from app.constants.prompt import greetings, greeting_words, quick_name_categories
 
-def get_quick_name(message: str) -> str | None:
-    message_lower = message.lower().strip()
-
-    # Simple greetings
-    greetings = ["hi", "hello", "hey", "hola", "greetings", "good morning", "good afternoon", "good evening"]
-    if message_lower in greetings or len(message_lower.split()) <= 2:
-        if any(word in message_lower for word in ["hi", "hello", "hey", "hola"]):
-            return "Greeting"
-
-    # Programming languages & frameworks
-    
-
-    for tech, name in programming.items():
-        if tech in message_lower:
-            return name
-
-    # Cities & locations (major cities worldwide)
-    
-
-    for city, name in cities.items():
-        if city in message_lower:
-            return name
-
-    # Weather related
-    if any(word in message_lower for word in ["weather", "temperature", "forecast", "rain", "snow", "sunny", "cloudy"]):
-        return "Weather"
 
-    # Food & cooking
-    if any(word in message_lower for word in ["recipe", "cook", "food", "meal", "dish", "restaurant", "cuisine"]):
-        return "Food & Cooking"
-
-    # Entertainment
-    if any(word in message_lower for word in ["joke", "funny", "laugh", "story", "game", "play"]):
-        return "Entertainment"
-
-    # Math & calculations
-    if any(word in message_lower for word in ["calculate", "math", "equation", "solve", "algebra", "geometry"]):
-        return "Math Help"
-
-    # Health & fitness
-    if any(word in message_lower for word in ["health", "fitness", "exercise", "workout", "diet", "nutrition"]):
-        return "Health & Fitness"
-
-    # Travel
-    if any(word in message_lower for word in ["travel", "trip", "vacation", "flight", "hotel", "tourist"]):
-        return "Travel"
-
-    # Shopping
-    if any(word in message_lower for word in ["buy", "purchase", "shop", "product", "price", "discount"]):
-        return "Shopping"
-
-    # News & current events
-    if any(word in message_lower for word in ["news", "current", "event", "happening", "today"]):
-        return "News"
-
-    # Technology general
-    if any(word in message_lower for word in ["computer", "laptop", "phone", "device", "tech", "software"]):
-        return "Technology"
+def _trie_pattern(keywords) -> str:
+    """
+    Regex alternation factored as a trie ("ma(?:th|chine learning|rket)..."),
+    so each position is checked in time proportional to the keyword length
+    rather than the number of keywords.
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
 
-    # Science topics
-    
+    def build(node) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
 
-    for topic, name in science_topics.items():
-        if topic in message_lower:
-            return name
+    return build(trie)
 
-    # AI & Machine Learning
-    if any(word in message_lower for word in ["ai", "artificial intelligence", "machine learning", "ml", "deep learning", "neural network"]):
-        return "AI & ML"
 
-    # Business & finance
-    if any(word in message_lower for word in ["business", "finance", "money", "investment", "stock", "market"]):
-        return "Business & Finance"
+# keyword -> (priority, session name), built once at import
+_quick_names = {}
+for category in quick_name_categories:
+    for keyword, name in category.items():
+        _quick_names.setdefault(keyword, (len(_quick_names), name))
 
-    # Education
-    if any(word in message_lower for word in ["learn", "study", "education", "course", "teach", "tutorial"]):
-        return "Learning"
+# Whole words only (so "ai" no longer matches "said"), allowing simple
+# inflections like "cooking" or "networks"; (?!\w) rather than \b keeps "c++"
+_QUICK_NAME_PATTERN = re.compile(rf"\b({_trie_pattern(_quick_names)})(?:s|es|ed|ing)?(?!\w)")
+_GREETING_PATTERN = re.compile(rf"\b({_trie_pattern(greeting_words)})\b")
 
-    # Books & reading
-    if any(word in message_lower for word in ["book", "read", "novel", "author", "literature"]):
-        return "Books"
 
-    # Movies & TV
-    if any(word in message_lower for word in ["movie", "film", "tv", "show", "series", "watch"]):
-        return "Movies & TV"
+def get_quick_name(message: str) -> str | None:
+    message_lower = message.lower().strip()
 
-    # Music
-    if any(word in message_lower for word in ["music", "song", "album", "artist", "band", "listen"]):
-        return "Music"
+    if message_lower in greetings or (len(message_lower.split()) <= 2 and _GREETING_PATTERN.search(message_lower)):
+        return "Greeting"
 
-    # Sports
-    if any(word in message_lower for word in ["sport", "football", "soccer", "basketball", "cricket", "tennis"]):
-        return "Sports"
+    # One scan over the message; the highest-priority keyword found wins
+    best = None
+    for match in _QUICK_NAME_PATTERN.finditer(message_lower):
+        candidate = _quick_names[match.group(1)]
+        if best is None or candidate < best:
+            best = candidate
 
-    return None  # No match found, use LLM 
+    return best[1] if best else None  # No match found, use LLM
 
 def get_name(message):
     """
@@ -298,3 +254,35 @@ def planner_replan_prompt(user_query: str, failed_queries: str):
     "sub query 3"
     ]
     """
+
+def get_summary_prompt(previous_summary: str, transcript: str) -> str:
+    return f"""
+    You maintain a running summary of a conversation between a user and an AI assistant.
+
+    Current summary:
+    {previous_summary or "(none yet)"}
+
+    New messages:
+    {transcript}
+
+    Task:
+    - Update the summary so it also covers the new messages.
+    - Keep facts, decisions, names, numbers and open questions the assistant may need later.
+    - Drop greetings and small talk.
+    - Write at most 200 words of plain text.
+
+    Response:
+    """
+
+def get_mermaid_repair_prompt(mermaid_code: str, issues: list) -> str:
+    errors = "\n".join(f"- line {issue['line']} `{issue['text']}`: {issue['message']}" for issue in issues)
+    return f"""Fix the syntax errors in this Mermaid diagram.
+
+Errors:
+{errors}
+
+Diagram:
+{mermaid_code}
+
+Change only what is needed to fix the errors listed above.
+Return ONLY the corrected Mermaid code, with no code blocks or explanations."""
@@ -1,10 +1,16 @@
 import os
-from typing import BinaryIO
+import asyncio
+import logging
+from typing import AsyncIterator, BinaryIO
+from botocore.exceptions import ClientError
 from app.helpers.aws_services import s3_client
+from app.constants.files import S3_MULTIPART_PART_SIZE
 
 bucket = os.getenv('BUCKET_NAME', 'amzon-s3-api-app')
 region = os.getenv('S3_REGION', 'ap-south-1')
 
+logger = logging.getLogger(__name__)
+
 def upload_bytes_to_s3(data: bytes, key: str, content_type: str = 'application/octet-stream') -> str:
     s3_client.put_object(
         Bucket=bucket,
@@ -25,6 +31,67 @@ def upload_file_to_s3(file_obj: BinaryIO, key: str, content_type: str = 'applica
     region = os.getenv('S3_REGION', 'ap-south-1')
     return get_s3_url(bucket, key, region)
 
+async def stream_to_s3(chunks: AsyncIterator[bytes], key: str, content_type: str, max_bytes: int) -> str:
+    """
+    Upload an async byte stream without holding more than one part in
+    memory. Small bodies go up in a single put_object, larger ones as a
+    multipart upload; boto3 calls run in a worker thread. Raises
+    ValueError once the stream passes max_bytes.
+    """
+    buffer = bytearray()
+    total = 0
+    upload_id = None
+    parts = []
+
+    async def upload_part(data: bytes):
+        part_number = len(parts) + 1
+        result = await asyncio.to_thread(
+            s3_client.upload_part,
+            Bucket=bucket, Key=key, UploadId=upload_id, PartNumber=part_number, Body=data
+        )
+        parts.append({'ETag': result['ETag'], 'PartNumber': part_number})
+
+    try:
+        async for chunk in chunks:
+            total += len(chunk)
+            if total > max_bytes:
+                raise ValueError(f"Upload exceeds {max_bytes} bytes")
+
+            buffer += chunk
+            if len(buffer) >= S3_MULTIPART_PART_SIZE:
+                if upload_id is None:
+                    upload = await asyncio.to_thread(
+                        s3_client.create_multipart_upload,
+                        Bucket=bucket, Key=key, ContentType=content_type
+                    )
+                    upload_id = upload['UploadId']
+                await upload_part(bytes(buffer))
+                buffer.clear()
+
+        if upload_id is None:
+            await asyncio.to_thread(
+                s3_client.put_object,
+                Bucket=bucket, Key=key, Body=bytes(buffer), ContentType=content_type
+            )
+        else:
+            if buffer:
+                await upload_part(bytes(buffer))
+            await asyncio.to_thread(
+                s3_client.complete_multipart_upload,
+                Bucket=bucket, Key=key, UploadId=upload_id, MultipartUpload={'Parts': parts}
+            )
+    except BaseException:
+        if upload_id is not None:
+            # Otherwise the uploaded parts are stored (and billed) indefinitely
+            try:
+                await asyncio.to_thread(s3_client.abort_multipart_upload, Bucket=bucket, Key=key, UploadId=upload_id)
+            except Exception as e:
+                logger.warning(f"Error aborting multipart upload {key}: {str(e)}")
+        raise
+
+    region = os.getenv('S3_REGION', 'ap-south-1')
+    return get_s3_url(bucket, key, region)
+
 def delete_from_s3(bucket: str, key: str) -> bool:
     try:
         s3_client.delete_object(Bucket=bucket, Key=key)
@@ -33,5 +100,14 @@ def delete_from_s3(bucket: str, key: str) -> bool:
         print(f"Error deleting from S3: {e}")
         return False
 
+def object_exists(key: str) -> bool:
+    try:
+        s3_client.head_object(Bucket=bucket, Key=key)
+        return True
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+            return False
+        raise
+
 def get_s3_url(bucket: str, key: str, region: str) -> str:
     return f"https://{bucket}.s3.{region}.amazonaws.com/{key}"
\ No newline at end of file